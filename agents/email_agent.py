@@ -1,25 +1,177 @@
+import os
+import json
 import time
 import random
-from typing import Optional, List
+import hashlib
+import threading
+from datetime import datetime
+from string import Template
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from itertools import chain, zip_longest
+from typing import Callable, Optional, List
+from googleapiclient.errors import HttpError
 from openai import OpenAI
 from config import Config
 from models.prospect import Prospect
 from utils.logger import setup_logger
 from utils.validators import validate_email
 from utils.gmail_oauth import GmailOAuthService
+from utils.cache import ResponseCache, make_key
+from utils.rate_limiter import TokenBucket
+from utils.http_clients import openai_http_client
 
 logger = setup_logger(__name__)
 
+# Gmail API statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+EMAIL_MODEL = "gpt-4o-mini"
+
+# Send pacing buckets keyed by recipient domain, shared by every EmailAgent instance, so
+# agents created per web request and overlapping bulk sends are paced against each other
+_DOMAIN_LIMITERS = {}
+_DOMAIN_LIMITERS_LOCK = threading.Lock()
+
+# Everything constant across a run lives in the system message, ahead of the
+# per-prospect user message, so OpenAI's automatic prompt cache (exact prefix
+# matches of 1024+ tokens) can reuse it for every prospect in a bulk send. The
+# instructions alone are kept past 1024 tokens, so the cache applies even without
+# a template (as on the web app): they split into over 1100 o200k pre-tokenizer
+# pieces, and each piece is at least one token
+EMAIL_WRITER_INSTRUCTIONS = """You are a professional email writer who creates brief, friendly, and effective outreach emails on behalf of a job seeker.
+
+Each request names one prospect: a person at a company the job seeker is interested in. Write one email to that person.
+
+The email should:
+- Be brief and friendly (2-3 short paragraphs)
+- Mention that you were researching the prospect's company, by name
+- Express interest in opportunities or collaboration
+- Request a brief conversation
+- Use a casual but professional tone
+
+Style guide:
+- Write in the first person as the job seeker. Never mention that the email was generated or that you are an assistant.
+- Keep the whole email under 150 words. Shorter is better as long as it stays warm and specific.
+- Open with a single sentence that explains why you are writing to this person specifically.
+- Prefer concrete, plain words over buzzwords. Avoid phrases like "synergy", "leverage", "passionate", "rockstar" or "ninja".
+- Do not invent facts about the prospect, their role, or their company. If you do not know something, leave it out rather than guessing.
+- Do not claim to have met the prospect, to know their colleagues, or to have been referred unless the request says so.
+- Do not include placeholders in square brackets; every sentence must be ready to send as written.
+- Do not include links, attachments, phone numbers, or a postal address.
+- Ask for one thing only: a short conversation (for example 15 minutes) at the prospect's convenience.
+- Keep the closing polite and low-pressure. Make it easy for the prospect to say no.
+- Use American English spelling and standard punctuation. No emojis, no exclamation marks in the subject or first sentence.
+- Do not use bullet points or headings inside the email.
+- Do not repeat the company name more than twice.
+
+Format rules:
+- Generate the email body only (no subject line).
+- Start with "Hi <first name>," using the prospect's first name exactly as given.
+- End with the sign-off given below, exactly as written, on its own lines.
+- Return plain text only, without Markdown formatting or surrounding quotes.
+
+Personalization:
+- Tailor the email to the prospect's company. If you know what the company does, refer to it in one short clause; otherwise keep the reference general.
+- If the job seeker's skills or goal are given below, connect one or two of them to the company in a single sentence. Do not list every skill.
+- Address the prospect as a peer, not as a gatekeeper. Do not ask them to forward your details.
+- If the prospect's name looks like a company or a placeholder, still greet them with the first name exactly as given.
+
+Example of a good email for a prospect named Dana Lee at Acme Robotics, signed by Sam Patel:
+
+Hi Dana,
+
+I was researching Acme Robotics and really liked how your team is bringing warehouse automation to smaller businesses. I'm a software engineer with a background in Python and embedded systems, and I'd love to learn more about where the team is heading.
+
+Would you be open to a quick 15-minute chat sometime in the next couple of weeks? I'd really appreciate hearing about your experience at Acme and whether there might be a fit for my skills.
+
+Best,
+Sam Patel
+
+A second example, for a prospect named Chris Morgan at Northwind Health, when the job seeker gave no skills or goal, signed by Alex Kim:
+
+Hi Chris,
+
+I came across Northwind Health while looking into companies that are making patient scheduling simpler, and your work there stood out to me.
+
+I'm exploring my next role and would value ten or fifteen minutes of your perspective on the team and what it looks for in new people. If now is a busy time, I completely understand.
+
+Best,
+Alex Kim
+
+Follow the structure and length of the examples, but never reuse their wording, companies, or details.
+
+Adjusting to the prospect's role:
+- Recruiters and talent partners: say plainly that you are exploring roles, and name the kind of role you are looking for if the goal gives it.
+- Hiring managers and team leads: focus on the team's work and ask about the problems they are solving, not about open positions.
+- Founders and executives: be especially brief, and make the single request easy to accept or decline.
+- Engineers, designers, and other individual contributors: ask about their day-to-day experience on the team rather than about hiring.
+- If the prospect's role is unknown, write for a hiring manager.
+
+Using the job seeker's details:
+- Treat the skills and goal as background for choosing one relevant detail, not as text to copy into the email.
+- If the goal names a location, seniority, or type of role, you may mention it once, in plain words.
+- If the skills are a long list, pick the one or two most relevant to the company and leave the rest out.
+- Never mention salary, visas, relocation packages, start dates, or notice periods.
+- Never describe the job seeker with superlatives such as "world-class", "expert", or "top-tier".
+\n
+Common mistakes to avoid:
+- Opening with "I hope this email finds you well" or any other filler sentence.
+- Apologizing for reaching out or for taking up the prospect's time.
+- Asking whether the company is hiring in the first sentence.
+- Describing the job seeker's entire career history; one relevant detail is enough.
+- Ending with more than one question or call to action.
+- Writing the prospect's full name in the greeting instead of the first name.
+- Adding a postscript (P.S.) or a signature block beyond the sign-off.
+- Using overly formal language such as "Dear Sir or Madam" or "To whom it may concern"."""
+
+def _recipient_domain(prospect: Prospect) -> str:
+    """Return the lowercased domain part of a prospect's email address"""
+    return prospect.email.rsplit('@', 1)[-1].lower()
+
+
+def _interleave_by_domain(prospects: List[Prospect]) -> List[Prospect]:
+    """Reorder prospects round-robin by recipient domain, so consecutive sends rarely share a domain"""
+    groups = {}
+    for prospect in prospects:
+        groups.setdefault(_recipient_domain(prospect), []).append(prospect)
+    return [p for p in chain.from_iterable(zip_longest(*groups.values())) if p is not None]
+
+
+# Per-prospect user message, compiled once; only these details vary between calls
+PROSPECT_PROMPT = Template("Prospect: $full_name at $company_name. First name: $first_name. Write the email.")
+
+
+@lru_cache(maxsize=32)
+def _read_template(template_path: str, mtime: float) -> str:
+    """Read a template file; mtime is part of the cache key so edits are picked up"""
+    with open(template_path, 'r') as f:
+        return f.read()
+
+
+def load_template(template_path: Optional[str]) -> str:
+    """Load an email template once per file version, returning '' if unavailable"""
+    if not template_path:
+        return ""
+    try:
+        return _read_template(template_path, os.path.getmtime(template_path))
+    except FileNotFoundError:
+        logger.warning(f"Template file not found: {template_path}, using default")
+        return ""
+
 class EmailAgent:
     """Agent for generating and sending emails using Gmail OAuth2"""
     
     def __init__(self, user_email: str = None):
-        self.openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        # Shares the process-wide connection pool, since the web app builds an agent per request
+        self.openai_client = OpenAI(api_key=Config.OPENAI_API_KEY, http_client=openai_http_client())
         self.user_email = user_email
         self.gmail_oauth = GmailOAuthService()
-        self.delay_min = 5  # Minimum delay between emails (seconds)
-        self.delay_max = 15  # Maximum delay between emails (seconds)
-        self._gmail_service = None
+        # Running OpenAI token usage for this agent, summed across worker threads
+        self.usage = {'prompt_tokens': 0, 'cached_tokens': 0, 'completion_tokens': 0}
+        self._usage_lock = threading.Lock()
+        self._gmail_services = {}  # user email -> Gmail service
+        self._response_cache = ResponseCache("emails", ttl=Config.EMAIL_CACHE_TTL)
     
     def get_gmail_service(self, user_email: str = None) -> object:
         """Get or create Gmail service for user"""
@@ -27,9 +179,9 @@ class EmailAgent:
         if not email:
             raise ValueError("User email is required for Gmail OAuth")
         
-        if not self._gmail_service:
-            self._gmail_service = self.gmail_oauth.get_gmail_service(email)
-        return self._gmail_service
+        if email not in self._gmail_services:
+            self._gmail_services[email] = self.gmail_oauth.get_gmail_service(email)
+        return self._gmail_services[email]
     
     def enhance_prompt(self, prompt: str) -> str:
         """
@@ -62,6 +214,56 @@ class EmailAgent:
             logger.warning(f"Prompt enhancement failed, using original prompt. Error: {e}")
             return prompt
 
+    def build_system_prompt(self, template: str = "", user_info: Optional[dict] = None) -> str:
+        """Build the static part of the generation prompt, shared by every prospect in a run"""
+        # Get user info for personalization
+        user_name = user_info.get('name', 'Job Seeker') if user_info else 'Job Seeker'
+        user_skills = user_info.get('skills', '') if user_info else ''
+        user_goal = user_info.get('goal', '') if user_info else ''
+        
+        # Most stable first: instructions, then the template, then per-user details
+        parts = [EMAIL_WRITER_INSTRUCTIONS]
+        if template:
+            parts.append(f"Use this template as a guide:\n{template}")
+        if user_skills:
+            parts.append(f"Mention your skills: {user_skills}")
+        if user_goal:
+            parts.append(f"Reference your goal: {user_goal}")
+        parts.append(f"Sign-off:\nBest,\n{user_name}")
+        return "\n\n".join(parts)
+    
+    def build_generator(self, template_path: Optional[str] = None,
+                        user_info: Optional[dict] = None) -> Callable[[Prospect], str]:
+        """
+        Specialize email generation for one run's template and user info
+        Everything constant is computed here once; the returned function only formats the prospect
+        """
+        system_prompt = self.build_system_prompt(load_template(template_path), user_info)
+        # Same digest as make_key(EMAIL_MODEL, system_prompt, prompt), with the constant prefix hashed once
+        key_prefix = hashlib.sha256(f"{EMAIL_MODEL}\x00{system_prompt}\x00".encode("utf-8"))
+        render = PROSPECT_PROMPT.substitute
+        
+        def generate(prospect: Prospect) -> str:
+            logger.info(f"Generating email for {prospect.full_name()}")
+            try:
+                prompt = render(
+                    full_name=prospect.full_name(),
+                    company_name=prospect.company_name,
+                    first_name=prospect.first_name
+                )
+                key = key_prefix.copy()
+                key.update(prompt.encode("utf-8"))
+                
+                email_body = self._generate_body(system_prompt, prompt, key.hexdigest())
+                logger.info(f"Generated email for {prospect.full_name()}")
+                return email_body
+                
+            except Exception as e:
+                logger.error(f"Error generating email: {str(e)}")
+                raise
+        
+        return generate
+    
     # Generate email
     def generate_email(self, prospect: Prospect, template_path: Optional[str] = None, 
                        user_info: Optional[dict] = None) -> str:
@@ -69,79 +271,99 @@ class EmailAgent:
         Generate personalized email using GPT
         Returns the email content in a simple, professional format
         """
-        logger.info(f"Generating email for {prospect.full_name()}")
+        return self.build_generator(template_path, user_info)(prospect)
+    
+    def _generate_body(self, system_prompt: str, prompt: str, key: Optional[str] = None) -> str:
+        """
+        Run the completion for a prompt, reusing a cached body when the exact
+        model + prompt was generated before (e.g. a rerun after a failed send)
+        """
+        key = key or make_key(EMAIL_MODEL, system_prompt, prompt)
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            logger.debug("Using cached email body")
+            return cached
+        
+        response = self.openai_client.chat.completions.create(
+            model=EMAIL_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=300
+        )
         
+        self._record_usage(response.usage)
+        
+        email_body = response.choices[0].message.content.strip()
+        self._response_cache.set(key, email_body)
+        return email_body
+    
+    def _record_usage(self, usage) -> None:
+        """Add one completion's token usage, including prompt cache hits, to the running totals"""
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+        logger.debug(f"Prompt cache: {cached_tokens}/{usage.prompt_tokens} tokens cached")
+        with self._usage_lock:
+            self.usage['prompt_tokens'] += usage.prompt_tokens or 0
+            self.usage['cached_tokens'] += cached_tokens
+            self.usage['completion_tokens'] += usage.completion_tokens or 0
+    
+    def _report_usage(self, results: dict, usage_before: dict) -> None:
+        """Add the tokens used since usage_before to results, log the cache hit rate and append it to the metrics file"""
+        for name in ('prompt_tokens', 'cached_tokens'):
+            results[name] = self.usage[name] - usage_before[name]
+        if not results['prompt_tokens']:
+            return
+        
+        hit_rate = results['cached_tokens'] / results['prompt_tokens']
+        logger.info(f"Prompt cache hit rate: {hit_rate:.1%} "
+                    f"({results['cached_tokens']}/{results['prompt_tokens']} prompt tokens)")
         try:
-            # Load template if provided
-            template = ""
-            if template_path:
-                try:
-                    with open(template_path, 'r') as f:
-                        template = f.read()
-                except FileNotFoundError:
-                    logger.warning(f"Template file not found: {template_path}, using default")
-            
-            # Get user info for personalization
-            user_name = user_info.get('name', 'Job Seeker') if user_info else 'Job Seeker'
-            user_skills = user_info.get('skills', '') if user_info else ''
-            user_goal = user_info.get('goal', '') if user_info else ''
-            
-            # Create prompt for GPT with user information
-            user_context = ""
-            if user_skills:
-                user_context += f"\n- Mention your skills: {user_skills}"
-            if user_goal:
-                user_context += f"\n- Reference your goal: {user_goal}"
-            
-#             prompt = f"""Generate a concise, professional email to {prospect.full_name()} at {prospect.company_name}.
-#             prompt = self.enhance_prompt(prompt)  
-# The email should:
-# - Be brief and friendly (2-3 short paragraphs)
-# - Mention that you were researching {prospect.company_name}
-# - Express interest in opportunities or collaboration{user_context}
-# - Request a brief conversation
-# - Use a casual but professional tone
-# - Be signed by {user_name}
-
-# {"Use this template as a guide:" + template if template else ""}
-
-# Generate the email body only (no subject line). Start with "Hi {prospect.first_name}," and end with "Best,\n{user_name}":"""
-            base_prompt = f"""Generate a concise, professional email to {prospect.full_name()} at {prospect.company_name}.
-
-The email should:
-- Be brief and friendly (2-3 short paragraphs)
-- Mention that you were researching {prospect.company_name}
-- Express interest in opportunities or collaboration{user_context}
-- Request a brief conversation
-- Use a casual but professional tone
-- Be signed by {user_name}
-
-{"Use this template as a guide:" + template if template else ""}
-
-Generate the email body only (no subject line).
-Start with "Hi {prospect.first_name},"
-and end with "Best,\\n{user_name}".
-"""
-
-            prompt = self.enhance_prompt(base_prompt)
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a professional email writer who creates brief, friendly, and effective outreach emails."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=300
-            )
-            
-            email_body = response.choices[0].message.content.strip()
-            logger.info(f"Generated email for {prospect.full_name()}")
-            return email_body
-            
-        except Exception as e:
-            logger.error(f"Error generating email: {str(e)}")
-            raise
+            with open(Config.METRICS_FILE, 'a') as f:
+                f.write(json.dumps({
+                    'timestamp': datetime.now().isoformat(),
+                    'model': EMAIL_MODEL,
+                    'emails': results['total'],
+                    'prompt_tokens': results['prompt_tokens'],
+                    'cached_tokens': results['cached_tokens'],
+                    'cache_hit_rate': round(hit_rate, 4)
+                }) + "\n")
+        except OSError as e:
+            logger.debug(f"Could not write metrics: {str(e)}")
+    
+    def generate_emails(self, prospects: List[Prospect], template_path: Optional[str] = None,
+                        user_info: Optional[dict] = None, concurrency: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Generate emails for many prospects in parallel
+        Returns bodies in prospect order, with None where generation failed
+        """
+        if not prospects:
+            return []
+        workers = min(concurrency or Config.OPENAI_CONCURRENCY, len(prospects))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = self.submit_generation(executor, prospects, template_path, user_info)
+            return [future.result() for future in futures]
+    
+    def submit_generation(self, executor: ThreadPoolExecutor, prospects: List[Prospect],
+                          template_path: Optional[str] = None,
+                          user_info: Optional[dict] = None) -> List[Future]:
+        """
+        Start generating emails for prospects on executor
+        Returns one future per prospect, in order, resolving to the body or None if generation failed
+        """
+        generate_one = self.build_generator(template_path, user_info)
+        
+        def generate(prospect: Prospect) -> Optional[str]:
+            try:
+                return generate_one(prospect)
+            except Exception:
+                return None  # Already logged by the generator
+        
+        return [executor.submit(generate, prospect) for prospect in prospects]
     
     def send_email(self, prospect: Prospect, subject: str, body: str, 
                   dry_run: bool = False, user_email: str = None) -> bool:
@@ -180,14 +402,22 @@ and end with "Best,\\n{user_name}".
     
     def generate_and_send(self, prospect: Prospect, template_path: Optional[str] = None, 
                          subject: Optional[str] = None, dry_run: bool = False,
-                         user_info: Optional[dict] = None, user_email: str = None) -> bool:
+                         user_info: Optional[dict] = None, user_email: str = None,
+                         generator: Optional[Callable[[Prospect], str]] = None) -> bool:
         """
         Generate and send email in one step
         Returns True if successful
         """
+        if not validate_email(prospect.email):
+            logger.error(f"Invalid email address: {prospect.email}")
+            return False
+        
         try:
             # Generate email body
-            body = self.generate_email(prospect, template_path, user_info=user_info)
+            if generator:
+                body = generator(prospect)
+            else:
+                body = self.generate_email(prospect, template_path, user_info=user_info)
             
             # Generate subject if not provided
             if not subject:
@@ -200,69 +430,252 @@ and end with "Best,\\n{user_name}".
             logger.error(f"Error in generate_and_send: {str(e)}")
             return False
     
+    def _email_subject(self, prospect: Prospect, subject: Optional[str]) -> str:
+        """Return the subject line for a prospect"""
+        return subject or f"Inquiry about openings at {prospect.company_name}"
+    
+    def _domain_limiter(self, prospect: Prospect) -> TokenBucket:
+        """Get the send pacing bucket for the prospect's email domain"""
+        domain = _recipient_domain(prospect)
+        with _DOMAIN_LIMITERS_LOCK:
+            if domain not in _DOMAIN_LIMITERS:
+                # capacity=1: no bursts, sends to one domain are spaced evenly
+                _DOMAIN_LIMITERS[domain] = TokenBucket(Config.EMAIL_DOMAIN_RATE / 60.0, capacity=1)
+            return _DOMAIN_LIMITERS[domain]
+    
+    def _send_with_backoff(self, service: object, prospect: Prospect, subject: str, body: str) -> None:
+        """Send a message, backing off exponentially on Gmail rate limits and server errors"""
+        for attempt in range(Config.MAX_RETRIES):
+            try:
+                self.gmail_oauth.send_message(
+                    service=service,
+                    recipient=prospect.email,
+                    subject=subject,
+                    body=body
+                )
+                return
+            except HttpError as e:
+                status = getattr(e.resp, 'status', None)
+                if status not in RETRYABLE_STATUSES or attempt == Config.MAX_RETRIES - 1:
+                    raise
+                wait_time = Config.RETRY_DELAY * (2 ** attempt) + random.random()
+                logger.warning(f"Gmail returned {status} for {prospect.email}, retrying in {wait_time:.1f}s")
+                time.sleep(wait_time)
+    
+    def _send_pooled(self, pool, prospect: Prospect, subject: Optional[str], body: str) -> bool:
+        """Send one pre-generated email using a service checked out from the pool"""
+        # Wait for the domain's turn before taking a service, so waiting never holds one
+        self._domain_limiter(prospect).acquire()
+        service = pool.acquire()
+        try:
+            self._send_with_backoff(service, prospect, self._email_subject(prospect, subject), body)
+        finally:
+            pool.release(service)
+        logger.info(f" Sent to: {prospect.full_name()} ({prospect.email})")
+        return True
+    
     def send_bulk_emails(self, prospects: List[Prospect], template_path: Optional[str] = None,
                          subject: Optional[str] = None, dry_run: bool = False,
-                         user_info: Optional[dict] = None, user_email: str = None) -> dict:
+                         user_info: Optional[dict] = None, user_email: str = None,
+                         concurrency: Optional[int] = None, batch: bool = False,
+                         on_progress: Optional[Callable[[dict], None]] = None) -> dict:
         """
-        Send emails to multiple prospects with human-like delays between sends
+        Send emails to multiple prospects
+        Outside batch mode, sends to any one recipient domain are paced at EMAIL_DOMAIN_RATE per minute;
+        with concurrency=1, sends serially in domain-interleaved order;
+        with concurrency>1, sends in parallel over a pool of Gmail services;
+        with batch=True, packs the sends into Gmail HTTP batch requests
+        on_progress, if given, is called with the running counts after each send succeeds or fails
         Returns a dictionary with success/failure counts
         """
         results = {
             'total': len(prospects),
             'sent': 0,
-            'failed': 0
+            'failed': 0,
+            'skipped': 0,
+            'prompt_tokens': 0,
+            'cached_tokens': 0
         }
+        usage_before = dict(self.usage)
+        notify = on_progress or (lambda counts: None)
+        
+        # Drop bad addresses and repeat recipients before paying for any generation
+        seen = set()
+        unique_prospects = []
+        for prospect in prospects:
+            if not validate_email(prospect.email):
+                logger.error(f"Invalid email address: {prospect.email}")
+                results['failed'] += 1
+            elif prospect.email.lower() in seen:
+                logger.info(f"Skipping duplicate recipient: {prospect.email}")
+                results['skipped'] += 1
+            else:
+                seen.add(prospect.email.lower())
+                unique_prospects.append(prospect)
+        prospects = unique_prospects
         
         if dry_run:
             logger.info(f"[DRY RUN] Would send {len(prospects)} emails")
+            generator = self.build_generator(template_path, user_info)
             for prospect in prospects:
                 self.generate_and_send(prospect, template_path, subject, dry_run=True, 
-                                     user_info=user_info, user_email=user_email)
-            results['sent'] = len(prospects)
+                                     user_info=user_info, user_email=user_email,
+                                     generator=generator)
+                results['sent'] += 1
+                notify(results)
+            self._report_usage(results, usage_before)
+            return results
+        if not prospects:
             return results
         
+        if batch:
+            # A batch needs its bodies up front, so generate them all first
+            bodies = self.generate_emails(prospects, template_path, user_info=user_info)
+            self._report_usage(results, usage_before)
+            return self._send_bulk_batched(prospects, bodies, results, subject, user_email, notify)
+        
+        # Alternate domains so the per-domain pacing rarely has to wait
+        prospects = _interleave_by_domain(prospects)
+        concurrency = min(concurrency or Config.EMAIL_CONCURRENCY, Config.EMAIL_MAX_CONCURRENCY, len(prospects))
+        
+        # Generation runs ahead in its own pool while sending consumes finished bodies,
+        # so OpenAI and Gmail waits overlap instead of adding up
+        executor = ThreadPoolExecutor(max_workers=min(Config.OPENAI_CONCURRENCY, len(prospects)))
+        try:
+            bodies = self.submit_generation(executor, prospects, template_path, user_info)
+            if concurrency > 1:
+                self._send_bulk_concurrent(prospects, bodies, results, concurrency, subject, user_email, notify)
+            else:
+                self._send_bulk_serial(prospects, bodies, results, subject, user_email, notify)
+        finally:
+            # Drop generations that have not started if sending gave up early
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        self._report_usage(results, usage_before)
+        logger.info(f" Bulk send complete: {results['sent']} sent, {results['failed']} failed")
+        return results
+    
+    def _send_bulk_serial(self, prospects: List[Prospect], bodies: List[Future],
+                          results: dict, subject: Optional[str], user_email: str,
+                          notify: Callable[[dict], None]) -> None:
+        """Send emails one at a time in prospect order, each as soon as its body is generated"""
         # Get Gmail service once
         try:
             service = self.get_gmail_service(user_email)
             logger.info(" Connected to Gmail API successfully.")
             
-            for idx, prospect in enumerate(prospects, 1):
+            for idx, (prospect, future) in enumerate(zip(prospects, bodies), 1):
                 logger.info(f"Processing {idx}/{len(prospects)}: {prospect.full_name()}")
+                body = future.result()
+                if body is None:
+                    results['failed'] += 1
+                    notify(results)
+                    continue
                 
                 try:
-                    # Generate email
-                    body = self.generate_email(prospect, template_path, user_info=user_info)
-                    if not subject:
-                        email_subject = f"Inquiry about openings at {prospect.company_name}"
-
-                    else:
-                        email_subject = subject
+                    email_subject = self._email_subject(prospect, subject)
+                    
+                    # Anti-spam: space out emails to the same recipient domain
+                    self._domain_limiter(prospect).acquire()
                     
                     # Send email via Gmail API
-                    self.gmail_oauth.send_message(
-                        service=service,
-                        recipient=prospect.email,
-                        subject=email_subject,
-                        body=body
-                    )
+                    self._send_with_backoff(service, prospect, email_subject, body)
                     
                     logger.info(f" Sent to: {prospect.full_name()} ({prospect.email})")
                     results['sent'] += 1
                     
-                    # Anti-spam: Wait 5 to 15 seconds between emails (except for last one)
-                    if idx < len(prospects):
-                        wait_time = random.randint(self.delay_min, self.delay_max)
-                        logger.info(f"⏳ Waiting {wait_time}s to simulate human behavior...")
-                        time.sleep(wait_time)
-                    
                 except Exception as e:
                     logger.error(f"Error sending to {prospect.email}: {str(e)}")
                     results['failed'] += 1
-                    continue
+                notify(results)
             
         except Exception as e:
             logger.error(f"Gmail API error: {str(e)}")
-            results['failed'] = len(prospects) - results['sent']
+            results['failed'] = results['total'] - results['skipped'] - results['sent']
+            notify(results)
+    
+    def _send_bulk_concurrent(self, prospects: List[Prospect], bodies: List[Future],
+                              results: dict, concurrency: int, subject: Optional[str],
+                              user_email: str, notify: Callable[[dict], None]) -> None:
+        """Send emails in parallel over a pool of Gmail services, each as soon as its body is generated"""
+        email = user_email or self.user_email
+        try:
+            if not email:
+                raise ValueError("User email is required for Gmail OAuth")
+            pool = self.gmail_oauth.get_service_pool(email, size=concurrency)
+        except Exception as e:
+            logger.error(f"Gmail API error: {str(e)}")
+            results['failed'] += len(prospects)
+            notify(results)
+            return
+        
+        logger.info(f" Sending {len(prospects)} emails with {concurrency} concurrent workers")
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            generated = dict(zip(bodies, prospects))
+            sends = {}
+            for future in as_completed(generated):
+                prospect = generated[future]
+                body = future.result()
+                if body is None:
+                    results['failed'] += 1
+                    notify(results)
+                    continue
+                sends[executor.submit(self._send_pooled, pool, prospect, subject, body)] = prospect
+            for future in as_completed(sends):
+                prospect = sends[future]
+                try:
+                    future.result()
+                    results['sent'] += 1
+                except Exception as e:
+                    logger.error(f"Error sending to {prospect.email}: {str(e)}")
+                    results['failed'] += 1
+                notify(results)
+    
+    def _send_bulk_batched(self, prospects: List[Prospect], bodies: List[Optional[str]],
+                           results: dict, subject: Optional[str], user_email: str,
+                           notify: Callable[[dict], None]) -> dict:
+        """Send emails via Gmail HTTP batches, resubmitting sub-requests that were rate limited"""
+        pending = []
+        for prospect, body in zip(prospects, bodies):
+            if body is None:
+                results['failed'] += 1
+            else:
+                pending.append((prospect, body))
+        
+        try:
+            service = self.get_gmail_service(user_email)
+            for attempt in range(Config.MAX_RETRIES):
+                if not pending:
+                    break
+                if attempt:
+                    wait_time = Config.RETRY_DELAY * (2 ** (attempt - 1)) + random.random()
+                    logger.info(f"⏳ Retrying {len(pending)} rate-limited emails in {wait_time:.1f}s")
+                    time.sleep(wait_time)
+                
+                messages = [
+                    {'recipient': p.email, 'subject': self._email_subject(p, subject), 'body': body}
+                    for p, body in pending
+                ]
+                outcomes = self.gmail_oauth.send_messages_batch(service, messages,
+                                                                batch_size=Config.GMAIL_BATCH_SIZE)
+                retry = []
+                for (prospect, body), outcome in zip(pending, outcomes):
+                    if not isinstance(outcome, Exception):
+                        logger.info(f" Sent to: {prospect.full_name()} ({prospect.email})")
+                        results['sent'] += 1
+                    elif (isinstance(outcome, HttpError) and getattr(outcome.resp, 'status', None) in RETRYABLE_STATUSES
+                          and attempt < Config.MAX_RETRIES - 1):
+                        retry.append((prospect, body))
+                    else:
+                        logger.error(f"Error sending to {prospect.email}: {str(outcome)}")
+                        results['failed'] += 1
+                notify(results)
+                pending = retry
+                
+        except Exception as e:
+            logger.error(f"Gmail API error: {str(e)}")
+            results['failed'] = results['total'] - results['skipped'] - results['sent']
+            notify(results)
         
         logger.info(f" Bulk send complete: {results['sent']} sent, {results['failed']} failed")
         return results
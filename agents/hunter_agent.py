@@ -1,63 +1,126 @@
 import time
+import logging
+import orjson
+import threading
 import requests
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, List
 from config import Config
 from models.prospect import Prospect
+from utils.cache import make_key
+from utils.http_clients import hunter_session
 from utils.logger import setup_logger
-from utils.validators import validate_email, extract_domain
+from utils.prospect_db import ProspectDatabase
+from utils.rate_limiter import TokenBucket, retry_after
+from utils.validators import is_corporate_domain, validate_email
 
 logger = setup_logger(__name__)
 
 class HunterAgent:
     """Agent for finding email addresses using Hunter.io API"""
     
-    def __init__(self):
+    def __init__(self, prospect_db: Optional[ProspectDatabase] = None, refresh: bool = False):
+        """
+        Args:
+            prospect_db: Cache of earlier Hunter responses; lookups hit the API every time without one
+            refresh: Ignore cached responses (fresh results are still stored)
+        """
         self.api_key = Config.HUNTER_API_KEY
         self.base_url = "https://api.hunter.io/v2"
-        self.last_request_time = 0
-        self.min_request_interval = 1.0 / Config.HUNTER_RATE_LIMIT
+        self.prospect_db = prospect_db
+        self.refresh = refresh
+        # Cached responses are keyed on a hash of the API key, so rotating the key invalidates them
+        self._api_key_hash = make_key(self.api_key or "")
+        # Shared across worker threads so parallel lookups still respect Hunter's QPS limit
+        self._limiter = TokenBucket(Config.HUNTER_RATE_LIMIT)
+        # Lookups currently on the wire, so identical concurrent lookups share one paid request
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Process-wide keep-alive session, so every agent instance reuses the TLS connections to api.hunter.io
+        self.session = hunter_session()
     
     def _rate_limit(self):
         """Implement rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
+        self._limiter.acquire()
+    
+    def _get_json(self, endpoint: str, params: dict, *key_parts: str) -> dict:
+        """
+        GET a Hunter endpoint and return the parsed JSON, served from the
+        prospect database when the same lookup was made before, or shared
+        with an identical lookup already in flight on another thread
+        """
+        key = make_key(endpoint, self._api_key_hash, *key_parts)
+        if self.prospect_db and not self.refresh:
+            cached = self.prospect_db.get_lookup(key)
+            if cached is not None:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Using cached Hunter {endpoint} response")
+                return cached
+        
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+        if not owner:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Waiting on in-flight Hunter {endpoint} request")
+            return pending.result()
+        
+        try:
+            self._rate_limit()
+            response = self.session.get(f"{self.base_url}/{endpoint}",
+                                        params={"api_key": self.api_key, **params}, timeout=10)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            
+            if self.prospect_db:
+                self.prospect_db.put_lookup(key, data)
+            pending.set_result(data)
+            return data
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
     
-    def find_email(self, prospect: Prospect, retries: int = 3) -> Optional[str]:
+    def find_email(self, prospect: Prospect, retries: int = 3,
+                   domain_emails: Optional[List[dict]] = None) -> Optional[str]:
         """
         Find email address for a prospect using Hunter.io
+        domain_emails, if given, is the company's domain search, already fetched, used as the fallback
         Returns email if found, None otherwise
         """
-        if not prospect.company_domain:
-            # Try to get domain from company name
-            domain = self._guess_domain(prospect.company_name)
-            if not domain:
-                logger.warning(f"No domain available for {prospect.company_name}")
+        params = {
+            "first_name": prospect.first_name,
+            "last_name": prospect.last_name
+        }
+        if prospect.company_domain:
+            if not is_corporate_domain(prospect.company_domain):
+                logger.info(f"Skipping {prospect.full_name()}: {prospect.company_domain} is not a company domain")
                 return None
-            prospect.company_domain = domain
+            params["domain"] = prospect.company_domain
+            target = prospect.company_domain.lower()
+        elif prospect.company_name:
+            # Hunter resolves the company name to its domain, rather than us guessing name.com
+            params["company"] = prospect.company_name
+            target = f"company:{prospect.company_name.lower()}"
+        else:
+            logger.warning(f"No domain or company available for {prospect.full_name()}")
+            return None
         
-        logger.info(f"Finding email for {prospect.full_name()} at {prospect.company_domain}")
+        logger.info(f"Finding email for {prospect.full_name()} at {prospect.company_domain or prospect.company_name}")
         
         for attempt in range(retries):
             try:
-                self._rate_limit()
-                
                 # Use email finder API
-                url = f"{self.base_url}/email-finder"
-                params = {
-                    "api_key": self.api_key,
-                    "domain": prospect.company_domain,
-                    "first_name": prospect.first_name,
-                    "last_name": prospect.last_name
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
+                data = self._get_json("email-finder", params, target,
+                                      prospect.first_name.lower(), prospect.last_name.lower())
                 
-                data = response.json()
+                if not prospect.company_domain and (data.get("data") or {}).get("domain"):
+                    # Keep the domain Hunter resolved, for the domain search fallback and the exports
+                    prospect.company_domain = data["data"]["domain"]
                 
                 if data.get("data") and data["data"].get("email"):
                     email = data["data"]["email"]
@@ -70,12 +133,20 @@ class HunterAgent:
                         logger.warning(f"Email found but low confidence: {email} (score: {score})")
                 
                 # Try domain search as fallback
+                if domain_emails is not None or not prospect.company_domain:
+                    return None  # Already searched and it didn't list this prospect, or no domain to search
                 return self._domain_search(prospect)
                 
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Attempt {attempt + 1} failed for {prospect.full_name()}: {str(e)}")
                 if attempt < retries - 1:
-                    time.sleep(Config.RETRY_DELAY * (attempt + 1))
+                    delay = Config.RETRY_DELAY * (attempt + 1)
+                    response = getattr(e, 'response', None)
+                    if response is not None and response.status_code == 429:
+                        # Hold every thread's lookups for as long as Hunter asks, not just this one
+                        self._limiter.pause(min(retry_after(response) or delay, Config.RETRY_MAX_DELAY))
+                    else:
+                        time.sleep(delay)
                 else:
                     logger.error(f"Failed to find email for {prospect.full_name()} after {retries} attempts")
                     return None
@@ -85,44 +156,119 @@ class HunterAgent:
         
         return None
     
-    def _domain_search(self, prospect: Prospect) -> Optional[str]:
-        """Search for email using domain search"""
+    def _find_email_logged(self, prospect: Prospect, domain_emails: Optional[List[dict]] = None) -> Optional[str]:
+        """find_email that logs and swallows errors, for use on worker threads"""
         try:
-            self._rate_limit()
-            url = f"{self.base_url}/domain-search"
-            params = {
-                "api_key": self.api_key,
-                "domain": prospect.company_domain,
-                "seniority": "senior",
-                "limit": 10
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            emails = data.get("data", {}).get("emails", [])
-            
-            # Try to match by name
-            for email_data in emails:
-                if (email_data.get("first_name", "").lower() == prospect.first_name.lower() and
-                    email_data.get("last_name", "").lower() == prospect.last_name.lower()):
-                    email = email_data.get("value")
-                    if validate_email(email):
-                        logger.info(f"Found email via domain search: {email}")
-                        return email
-            
+            return self.find_email(prospect, domain_emails=domain_emails)
+        except Exception as e:
+            logger.warning(f"Error finding email for {prospect.full_name()}: {str(e)}")
             return None
+    
+    def submit_lookup(self, executor: ThreadPoolExecutor, prospect: Prospect) -> Future:
+        """
+        Start finding a prospect's email on executor
+        Returns a future resolving to the email, or None if none was found or the lookup failed
+        """
+        return executor.submit(self._find_email_logged, prospect)
+    
+    def find_emails_bulk(self, prospects: List[Prospect], concurrency: Optional[int] = None,
+                         on_result: Optional[Callable[[Prospect, Optional[str]], None]] = None) -> List[Optional[str]]:
+        """
+        Find emails for many prospects in parallel
+        Companies with several prospects get one domain search first, so only the prospects
+        it doesn't list need their own email-finder request
+        Prospects at free-mail or job board domains are skipped without a request
+        on_result, if given, is called from the calling thread as each lookup finishes (e.g. for progress)
+        Returns emails in prospect order, with None where no email was found
+        """
+        if not prospects:
+            return []
+        
+        by_domain = {}
+        skipped = []
+        for idx, prospect in enumerate(prospects):
+            domain = (prospect.company_domain or "").lower()
+            if domain and not is_corporate_domain(domain):
+                skipped.append(idx)
+                continue
+            # Prospects without a domain each go singly to find_email, which looks them up by company name
+            by_domain.setdefault(domain or idx, []).append(idx)
+        
+        emails = [None] * len(prospects)
+        if skipped:
+            logger.info(f"Skipping {len(skipped)} prospects at free-mail or job board domains")
+            if on_result:
+                for idx in skipped:
+                    on_result(prospects[idx], None)
+        if not by_domain:
+            return emails
+        
+        workers = min(concurrency or Config.HUNTER_CONCURRENCY, len(prospects))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each pending future maps to a prospect index (email lookup) or a domain's indexes (domain search)
+            pending = {}
+            for domain, indexes in by_domain.items():
+                if len(indexes) > 1:
+                    pending[executor.submit(self._domain_emails_logged, domain, True)] = indexes
+                else:
+                    pending[self.submit_lookup(executor, prospects[indexes[0]])] = indexes[0]
             
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    target = pending.pop(future)
+                    if isinstance(target, int):
+                        emails[target] = future.result()
+                        if on_result:
+                            on_result(prospects[target], emails[target])
+                        continue
+                    # A failed domain search counts as tried, so find_email doesn't repeat it per prospect
+                    listed = future.result() or []
+                    for idx in target:
+                        emails[idx] = self._match_email(prospects[idx], listed)
+                        if emails[idx] is None:
+                            pending[executor.submit(self._find_email_logged, prospects[idx], listed)] = idx
+                        elif on_result:
+                            on_result(prospects[idx], emails[idx])
+        return emails
+    
+    def _domain_emails(self, domain: str, everyone: bool = False) -> List[dict]:
+        """
+        Return the contacts Hunter lists for a domain
+        Senior contacts only by default, as the single-prospect fallback; everyone=True lists
+        the company's people without a seniority filter, to match several prospects locally
+        """
+        if everyone:
+            params = {"domain": domain, "limit": Config.HUNTER_DOMAIN_SEARCH_LIMIT}
+        else:
+            params = {"domain": domain, "seniority": "senior", "limit": 10}
+        # Keyed on the domain (and "all" for the unfiltered search), so prospects at the same
+        # company share one search and earlier senior searches stay cached
+        key_parts = (domain.lower(), "all") if everyone else (domain.lower(),)
+        data = self._get_json("domain-search", params, *key_parts)
+        return data.get("data", {}).get("emails", [])
+    
+    def _domain_emails_logged(self, domain: str, everyone: bool = False) -> Optional[List[dict]]:
+        """_domain_emails that returns None on failure, for use on worker threads"""
+        try:
+            return self._domain_emails(domain, everyone=everyone)
         except Exception as e:
             logger.debug(f"Domain search failed: {str(e)}")
             return None
     
-    def _guess_domain(self, company_name: str) -> Optional[str]:
-        """Guess company domain from company name"""
-        # Simple heuristic: convert company name to domain
-        # In production, you might want to use a domain lookup service
-        domain = company_name.lower().replace(" ", "").replace("&", "and")
-        domain = domain.replace(",", "").replace(".", "")
-        # This is a simplified approach - in production, use a proper domain lookup
-        return f"{domain}.com"  # This is just a placeholder
+    @staticmethod
+    def _match_email(prospect: Prospect, emails: List[dict]) -> Optional[str]:
+        """Return the valid email a domain search lists under the prospect's name, if any"""
+        for email_data in emails:
+            if ((email_data.get("first_name") or "").lower() == prospect.first_name.lower() and
+                    (email_data.get("last_name") or "").lower() == prospect.last_name.lower()):
+                email = email_data.get("value")
+                if validate_email(email):
+                    logger.info(f"Found email via domain search: {email}")
+                    return email
+        return None
+    
+    def _domain_search(self, prospect: Prospect) -> Optional[str]:
+        """Search for email using domain search"""
+        listed = self._domain_emails_logged(prospect.company_domain)
+        return self._match_email(prospect, listed) if listed else None
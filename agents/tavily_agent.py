@@ -1,77 +1,480 @@
 import time
+import random
 import re
 import json
-from typing import List, Set
+import logging
+import orjson
+import requests
+import tldextract
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Set
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from tavily import TavilyClient
+from tavily.errors import UsageLimitExceededError, TimeoutError as TavilyTimeoutError
 from openai import OpenAI
 from config import Config
 from models.prospect import Company, Prospect
+from models.extraction import BatchProspectList, CompanyList, LeadList, ProspectList, response_format
 from utils.logger import setup_logger
+from utils.rate_limiter import TokenBucket
+from utils.cache import ResponseCache, SemanticCache, make_key
+from utils.http_clients import openai_http_client, tavily_session
 from utils.validators import extract_domain, parse_name
 
 logger = setup_logger(__name__)
 
+EXTRACTION_MODEL = "gpt-4o-mini"
+EMBEDDING_MODEL = "text-embedding-3-small"
+# Public Suffix List lookup for deriving a company name from its domain; uses the
+# bundled snapshot so it never fetches the list over the network
+_extract_tld = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+# Cheap checks that skip results with nothing for GPT to extract
+_HIRING_RE = re.compile(r"\b(?:hiring|careers?|jobs? at|open roles|openings|we're hiring)\b", re.IGNORECASE)
+_LI_PROFILE_RE = re.compile(r'linkedin\.com/in/[\w\-%]+', re.IGNORECASE)
+# LinkedIn profile titles look like "Jane Doe - Recruiter - Acme | LinkedIn" or "Jane Doe - Recruiter at Acme | LinkedIn"
+_LI_TITLE_SUFFIX_RE = re.compile(r'\s*\|\s*LinkedIn\s*$', re.IGNORECASE)
+_LI_TITLE_SEP_RE = re.compile(r'\s+[-\u2013\u2014]\s+')
+_AT_COMPANY_RE = re.compile(r'\s+at\s+(.+)$', re.IGNORECASE)
+# Title "companies" that name no employer to look up; those results are left to GPT
+_NOT_A_COMPANY = frozenset({'self-employed', 'self employed', 'freelance', 'freelancer',
+                            'independent', 'stealth', 'stealth startup', 'confidential'})
+COMPANY_CONTEXT_LIMIT = 3000  # Characters of search results passed to company extraction
+LINKEDIN_CONTEXT_LIMIT = 5000  # Characters of LinkedIn results passed to lead extraction
+LINKEDIN_CONTENT_LIMIT = 400  # Characters of content kept per LinkedIn result
+
+# System prompts, kept constant so every call of a kind shares the same cacheable prompt prefix
+COMPANY_SYSTEM_PROMPT = "You are a helpful assistant that extracts company names from job search results."
+BATCH_PROSPECT_SYSTEM_PROMPT = ("You are a helpful assistant that extracts hiring manager and recruiter information. "
+                                "Return only valid JSON.")
+PROSPECT_SYSTEM_PROMPT = ("You are a helpful assistant that extracts hiring manager and recruiter information. "
+                          "Return a JSON object with a 'prospects' key containing an array of prospect objects.")
+LEAD_SYSTEM_PROMPT = ("You are a lead generation expert. Extract people's information from LinkedIn search results. "
+                      "Return only valid JSON.")
+
+# Structured output formats, so GPT can only return JSON matching the extraction models
+COMPANY_FORMAT = response_format(CompanyList)
+PROSPECT_FORMAT = response_format(ProspectList)
+BATCH_PROSPECT_FORMAT = response_format(BatchProspectList)
+LEAD_FORMAT = response_format(LeadList)
+
+
+def _canonical_url(url: str) -> str:
+    """Normalize a URL for duplicate detection: lowercase, no fragment, tracking params or trailing slash"""
+    parts = urlsplit(url.strip().lower())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.startswith('utm_')])
+    return urlunsplit((parts.scheme, parts.netloc.removeprefix('www.'), parts.path.rstrip('/'), query, ''))
+
+
+def _dedupe_results(results: List[dict]) -> List[dict]:
+    """Drop results whose URL repeats an earlier one, so the same page isn't sent to GPT twice"""
+    seen = set()
+    unique = []
+    for result in results:
+        url = result.get('url')
+        if url:
+            key = _canonical_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+        unique.append(result)
+    if len(unique) < len(results):
+        logger.info(f"Removed {len(results) - len(unique)} duplicate results")
+    return unique
+
+
+def _mentions_hiring(result: dict) -> bool:
+    """Whether a result's title or opening text talks about hiring"""
+    return bool(_HIRING_RE.search(f"{result.get('title') or ''} {(result.get('content') or '')[:200]}"))
+
+
+def _is_linkedin_profile(result: dict) -> bool:
+    """Whether a result is a LinkedIn member profile page"""
+    return bool(_LI_PROFILE_RE.search(result.get('url') or ''))
+
+
+def _prefilter(results: List[dict], keep: Callable[[dict], bool], label: str) -> List[dict]:
+    """
+    Drop results that obviously have nothing to extract before they reach GPT
+    If nothing passes, the results are returned unfiltered rather than losing the search
+    """
+    kept = [r for r in results if keep(r)]
+    if not kept:
+        return results
+    if len(kept) < len(results):
+        logger.info(f"Prefilter kept {len(kept)}/{len(results)} {label} results")
+    return kept
+
+
+def _join_until(parts, limit: Optional[int]) -> str:
+    """
+    Join lines with newlines, stopping once limit characters are covered; the prompts slice to
+    limit anyway, so this gives the same text without building the discarded tail
+    """
+    if limit is None:
+        return "\n".join(parts)
+    kept, size = [], 0
+    for part in parts:
+        kept.append(part)
+        size += len(part) + 1
+        if size >= limit:
+            break
+    return "\n".join(kept)
+
+
+def _format_results(results: List[dict], content_limit: int = 500, limit: Optional[int] = None) -> str:
+    """Format search results as prompt text, one Title/Content/URL/Date block per result"""
+    get = dict.get
+    return _join_until((
+        f"Title: {get(r, 'title', '')}\nContent: {get(r, 'content', '')[:content_limit]}\n"
+        f"URL: {get(r, 'url', '')}\nDate: {get(r, 'published_date', 'N/A')}\n"
+        for r in results
+    ), limit)
+
+
+def _format_company_results(results: List[dict], snippet_limit: int = 120, limit: Optional[int] = None) -> str:
+    """Format search results as compact 'Title | Domain | Snippet' lines; company extraction doesn't need page bodies"""
+    get = dict.get
+    return _join_until((
+        f"{(get(r, 'title') or '')[:snippet_limit]} | {extract_domain(get(r, 'url')) or ''} | "
+        f"{(get(r, 'content') or '')[:snippet_limit]}"
+        for r in results
+    ), limit)
+
+
+def _format_linkedin_results(results: List[dict], limit: int = LINKEDIN_CONTEXT_LIMIT) -> str:
+    """
+    Format LinkedIn results as prompt text, keeping only whole results that fit within limit characters
+    so the prompt never ends on a half-cut result
+    """
+    get = dict.get
+    parts, size = [], 0
+    for r in results:
+        content = (get(r, 'content') or '')[:LINKEDIN_CONTENT_LIMIT]
+        part = f"URL: {get(r, 'url', '')}\nContent: {content}\nDate: {get(r, 'published_date', 'N/A')}\n---\n"
+        if size + len(part) > limit:
+            break
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+
+def _filter_by_date(results: List[dict], cutoff_str: str, cutoff_date: datetime, days_filter: int) -> List[dict]:
+    """
+    Filter search results to only include those published on or after the cutoff
+    Module-level so it can also run in a worker process
+    """
+    filtered_results = []
+    debug = logger.isEnabledFor(logging.DEBUG)
+    
+    for result in results:
+        # Check if result has published_date
+        published_date = result.get('published_date')
+        
+        if not published_date:
+            # If no date available, include the result
+            if debug:
+                logger.debug("No published_date found, including result")
+            filtered_results.append(result)
+            continue
+        
+        # ISO dates (YYYY-MM-DD...) sort lexicographically, so compare the day as a string
+        if len(published_date) >= 10 and published_date[4] == '-' and published_date[7] == '-':
+            included = published_date[:10] >= cutoff_str
+        else:
+            try:
+                result_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+                included = result_date.replace(tzinfo=None) >= cutoff_date
+            except (ValueError, AttributeError):
+                # If date parsing fails, include the result (better to include than exclude)
+                if debug:
+                    logger.debug(f"Could not parse date '{published_date}', including result anyway")
+                filtered_results.append(result)
+                continue
+        
+        # Check if within date range
+        if included:
+            filtered_results.append(result)
+            if debug:
+                logger.debug(f"✓ Included result from {published_date}")
+        elif debug:
+            logger.debug(f"✗ Filtered out result from {published_date} (older than {days_filter} days)")
+    
+    logger.info(f"Date filter: {len(results)} results → {len(filtered_results)} results (within {days_filter} days)")
+    return filtered_results
+
+
+def _lead_to_prospect(lead: dict) -> Optional[Prospect]:
+    """Convert an extracted LinkedIn lead to a Prospect; None if it has no first name"""
+    first_name = (lead.get('first_name') or '').strip()
+    if not first_name:  # At least first name is required
+        return None
+    domain = (lead.get('domain') or '').strip()
+    linkedin_url = (lead.get('linkedin_url') or '').strip()
+    
+    return Prospect(
+        first_name=first_name,
+        last_name=(lead.get('last_name') or '').strip(),
+        # Extract company name from domain if possible
+        company_name=_extract_tld(domain).domain.title() or "Unknown Company",
+        company_domain=domain if domain else None,
+        linkedin_profile=linkedin_url if linkedin_url else None
+    )
+
+
+def _prospect_from_title(result: dict) -> Optional[Prospect]:
+    """
+    Read a prospect straight from a LinkedIn profile result's page title, without GPT
+    Returns None unless the title clearly gives a full name and a company
+    """
+    title = result.get('title') or ''
+    url = result.get('url') or ''
+    if not _LI_TITLE_SUFFIX_RE.search(title) or not _LI_PROFILE_RE.search(url):
+        return None
+    parts = _LI_TITLE_SEP_RE.split(_LI_TITLE_SUFFIX_RE.sub('', title))
+    if len(parts) < 2 or len(parts[0].split()) > 4 or any(ch.isdigit() for ch in parts[0]):
+        return None
+    first_name, last_name = parse_name(parts[0])
+    if not last_name:
+        return None
+    
+    if len(parts) >= 3:
+        job_title, company = " - ".join(parts[1:-1]), parts[-1]
+    else:
+        # A lone second part is only unambiguous as "Role at Company"
+        match = _AT_COMPANY_RE.search(parts[1])
+        if not match:
+            return None
+        job_title, company = parts[1][:match.start()], match.group(1)
+    company = company.strip()
+    if not company or company.lower() in _NOT_A_COMPANY:
+        return None
+    
+    return Prospect(
+        first_name=first_name,
+        last_name=last_name,
+        company_name=company,
+        linkedin_profile=url,
+        job_title=job_title.strip() or None
+    )
+
+
+def _prospect_results_text(results: List[dict], cutoff_str: str, cutoff_date: datetime, days_filter: int) -> str:
+    """Date-filter, dedupe and format one prospect search's results; picklable for the post-processing pool"""
+    return _format_results(_dedupe_results(_filter_by_date(results, cutoff_str, cutoff_date, days_filter)),
+                           limit=Config.EXTRACTION_TEXT_LIMIT)
+
+
 class TavilyAgent:
     """Agent for performing web searches using Tavily AI"""
     
-    def __init__(self, days_filter: int = 45):
+    def __init__(self, days_filter: int = 45, refresh: bool = False):
+        """
+        Initialize the agent
+        
+        Args:
+            days_filter: Only keep results published in the last N days
+            refresh: Ignore cached searches and extractions (fresh results are still stored)
+        """
         # Validate API keys before initializing clients
         if not Config.TAVILY_API_KEY or Config.TAVILY_API_KEY == "your_tavily_api_key_here":
             raise ValueError("TAVILY_API_KEY is not set or is still a placeholder. Please set it in your .env file.")
         if not Config.OPENAI_API_KEY or Config.OPENAI_API_KEY == "your_openai_api_key_here":
             raise ValueError("OPENAI_API_KEY is not set or is still a placeholder. Please set it in your .env file.")
         
-        self.client = TavilyClient(api_key=Config.TAVILY_API_KEY)
-        self.openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
-        self.last_request_time = 0
-        self.min_request_interval = 1.0 / Config.TAVILY_RATE_LIMIT
+        # Both clients draw on process-wide connection pools, so every agent instance (and the
+        # email agent) reuses kept-alive connections instead of opening and TLS-handshaking new ones
+        try:
+            self.client = TavilyClient(api_key=Config.TAVILY_API_KEY, session=tavily_session())
+        except TypeError:  # Older tavily-python builds its own session
+            self.client = TavilyClient(api_key=Config.TAVILY_API_KEY)
+        # The SDK retries 429/5xx/connection errors with jittered exponential backoff, honoring Retry-After
+        self.openai_client = OpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            max_retries=Config.SEARCH_MAX_RETRIES,
+            http_client=openai_http_client()
+        )
+        # Shared by concurrent searches: bursts up to TAVILY_BURST, sustained TAVILY_RATE_LIMIT/s,
+        # at most TAVILY_MAX_IN_FLIGHT open at once however many threads (or web requests) search
+        self._bucket = TokenBucket(Config.TAVILY_RATE_LIMIT, capacity=Config.TAVILY_BURST,
+                                   max_in_flight=Config.TAVILY_MAX_IN_FLIGHT)
+        self.refresh = refresh
+        self._search_cache = ResponseCache("tavily", ttl=Config.SEARCH_CACHE_TTL)
+        self._extraction_cache = ResponseCache("extractions", ttl=Config.EXTRACTION_CACHE_TTL)
+        # Opt-in: paraphrased goals reuse an earlier search's results
+        self._semantic_cache = None
+        if Config.SEMANTIC_CACHE:
+            self._embedding_cache = ResponseCache("embeddings", ttl=Config.SEMANTIC_CACHE_TTL)
+            self._semantic_cache = SemanticCache("searches", self._embed,
+                                                 threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+                                                 ttl=Config.SEMANTIC_CACHE_TTL)
         self.days_filter = days_filter  # Filter results to last N days
-        self.cutoff_date = datetime.now() - timedelta(days=days_filter)
-        logger.info(f"TavilyAgent initialized with {days_filter}-day filter (cutoff: {self.cutoff_date.strftime('%Y-%m-%d')})")
+        logger.info(f"TavilyAgent initialized with {days_filter}-day filter (cutoff: {self._cutoff()[0]})")
+    
+    def _cutoff(self) -> tuple:
+        """
+        Return the date filter's cutoff as (YYYY-MM-DD string, datetime), computed per search
+        so an agent kept for the life of the web server doesn't filter against its start date
+        The string is for cheap compares against ISO dates
+        """
+        cutoff_date = datetime.now() - timedelta(days=self.days_filter)
+        return cutoff_date.strftime('%Y-%m-%d'), cutoff_date
+    
+    def clear_cache(self):
+        """Drop stored searches and extractions, so the next identical query hits the APIs again"""
+        self._search_cache.clear()
+        self._extraction_cache.clear()
+        if self._semantic_cache:
+            self._semantic_cache.clear()
+        logger.info("Cleared cached searches and extractions")
+    
+    def _search(self, **params) -> dict:
+        """
+        Run a rate-limited Tavily search, retrying rate limits, timeouts,
+        connection errors and 5xx responses with exponential backoff and jitter
+        Responses are cached by their exact parameters for SEARCH_CACHE_TTL
+        """
+        key = make_key(json.dumps(params, sort_keys=True))
+        cached = None if self.refresh else self._search_cache.get(key)
+        if cached is not None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Using cached Tavily search: {params.get('query')}")
+            return cached
+        
+        for attempt in range(Config.SEARCH_MAX_RETRIES):
+            try:
+                with self._bucket.slot():
+                    response = self.client.search(**params)
+                self._search_cache.set(key, response)
+                return response
+            except (UsageLimitExceededError, TavilyTimeoutError, requests.exceptions.ConnectionError,
+                    requests.exceptions.HTTPError) as e:
+                response = getattr(e, 'response', None)
+                status = getattr(response, 'status_code', None)
+                if (status is not None and status < 500) or attempt == Config.SEARCH_MAX_RETRIES - 1:
+                    raise
+                wait_time = min(Config.RETRY_DELAY * (2 ** attempt), Config.RETRY_MAX_DELAY) + random.random()
+                logger.warning(f"Tavily search failed ({str(e) or type(e).__name__}), retrying in {wait_time:.1f}s")
+                if isinstance(e, UsageLimitExceededError):
+                    # A 429 means every thread is going too fast, so hold them all, not just this one
+                    self._bucket.pause(wait_time)
+                else:
+                    time.sleep(wait_time)
     
-    def _rate_limit(self):
-        """Implement rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
+    def _embed(self, text: str) -> List[float]:
+        """Embed a goal for the semantic cache, reusing stored embeddings of identical text"""
+        key = make_key(EMBEDDING_MODEL, text)
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
+            return cached
+        response = self.openai_client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        vector = response.data[0].embedding
+        self._embedding_cache.set(key, vector)
+        return vector
+    
+    def _complete(self, system_prompt: str, prompt: str, **options) -> str:
+        """
+        Run a GPT extraction and return the message content, reusing the stored
+        response when the exact same model + prompt + options ran before
+        """
+        key = make_key(EXTRACTION_MODEL, system_prompt, prompt, json.dumps(options, sort_keys=True))
+        cached = None if self.refresh else self._extraction_cache.get(key)
+        if cached is not None:
+            logger.debug("Using cached GPT extraction")
+            return cached
+        
+        response = self.openai_client.chat.completions.create(
+            model=EXTRACTION_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            **options
+        )
+        content = response.choices[0].message.content.strip()
+        self._extraction_cache.set(key, content)
+        return content
+    
+    def _stream_json_items(self, system_prompt: str, prompt: str, key: str, limit: Optional[int] = None,
+                           on_item: Optional[Callable[[dict], None]] = None, **options) -> List[dict]:
+        """
+        Stream a GPT completion shaped like {key: [{...}, ...]} and decode each array
+        item as soon as it is complete, closing the stream once limit items have arrived
+        on_item, if given, is called with each item as it is decoded (or read from cache)
+        Results are cached like _complete, keyed on the limit as well
+        """
+        cache_key = make_key(EXTRACTION_MODEL, system_prompt, prompt,
+                             json.dumps({**options, "items": key, "limit": limit}, sort_keys=True))
+        cached = None if self.refresh else self._extraction_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Using cached GPT extraction")
+            items = orjson.loads(cached).get(key, [])
+            if on_item:
+                for item in items:
+                    on_item(item)
+            return items
+        
+        stream = self.openai_client.chat.completions.create(
+            model=EXTRACTION_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            stream=True,
+            **options
+        )
+        decoder = json.JSONDecoder()
+        array_start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        buffer, pos, items = "", None, []
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                buffer += delta
+                if pos is None:
+                    match = array_start.search(buffer)
+                    if not match:
+                        continue
+                    pos = match.end()
+                
+                # Decode every item that has fully arrived; a partial object raises and waits for more
+                while True:
+                    while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                        pos += 1
+                    if pos >= len(buffer) or buffer[pos] == "]":
+                        break
+                    try:
+                        item, pos = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        break
+                    items.append(item)
+                    if on_item and (not limit or len(items) <= limit):
+                        on_item(item)
+                
+                if limit and len(items) >= limit:
+                    logger.debug(f"Stopping GPT stream early after {len(items)} {key}")
+                    break
+        finally:
+            stream.close()
+        
+        streamed = pos is not None
+        if not streamed:
+            # The array never appeared; fall back to parsing whatever JSON arrived
+            items = orjson.loads(buffer).get(key, []) if buffer else []
+        items = items[:limit] if limit else items
+        if on_item and not streamed:
+            for item in items:
+                on_item(item)
+        self._extraction_cache.set(cache_key, orjson.dumps({key: items}).decode())
+        return items
     
     def _filter_results_by_date(self, results: List[dict]) -> List[dict]:
         """
         Filter search results to only include those within the date range
         Returns filtered list of results
         """
-        filtered_results = []
-        
-        for result in results:
-            # Check if result has published_date
-            published_date = result.get('published_date')
-            
-            if published_date:
-                try:
-                    # Parse the date (Tavily returns ISO format: YYYY-MM-DD)
-                    result_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
-                    
-                    # Check if within date range
-                    if result_date >= self.cutoff_date:
-                        filtered_results.append(result)
-                        logger.debug(f"✓ Included result from {published_date}")
-                    else:
-                        logger.debug(f"✗ Filtered out result from {published_date} (older than {self.days_filter} days)")
-                except (ValueError, AttributeError) as e:
-                    # If date parsing fails, include the result (better to include than exclude)
-                    logger.debug(f"Could not parse date '{published_date}', including result anyway")
-                    filtered_results.append(result)
-            else:
-                # If no date available, include the result
-                logger.debug("No published_date found, including result")
-                filtered_results.append(result)
-        
-        logger.info(f"Date filter: {len(results)} results → {len(filtered_results)} results (within {self.days_filter} days)")
-        return filtered_results
+        return _filter_by_date(results, *self._cutoff(), self.days_filter)
     
     def search_companies(self, goal: str, max_results: int = 50) -> Set[Company]:
         """
@@ -80,11 +483,15 @@ class TavilyAgent:
         """
         logger.info(f"Searching for companies: {goal}")
         companies = set()
+        scope = f"companies:{max_results}:{self.days_filter}"
+        if self._semantic_cache and not self.refresh:
+            cached = self._semantic_cache.get(goal, scope)
+            if cached is not None:
+                return {Company(**data) for data in cached}
         
         try:
-            self._rate_limit()
             query = f"{goal} companies hiring job openings"
-            response = self.client.search(
+            response = self._search(
                 query=query,
                 max_results=max_results,
                 search_depth="advanced",
@@ -93,23 +500,27 @@ class TavilyAgent:
             
             # Filter results by date
             results = response.get('results', [])
-            filtered_results = self._filter_results_by_date(results)
+            filtered_results = _dedupe_results(self._filter_results_by_date(results))
+            filtered_results = _prefilter(filtered_results, _mentions_hiring, "hiring")
             
             # Extract company names from filtered results using GPT
-            results_text = "\n".join([
-                f"Title: {r.get('title', '')}\nContent: {r.get('content', '')[:500]}\nURL: {r.get('url', '')}\nDate: {r.get('published_date', 'N/A')}\n"
-                for r in filtered_results
-            ])
+            results_text = _format_company_results(filtered_results, limit=COMPANY_CONTEXT_LIMIT)
             
             if results_text:
                 company_names = self._extract_companies_with_gpt(goal, results_text)
+                # Dedupe on the lowercased name (Company's identity) before building objects
+                seen_names = set()
                 for name in company_names:
-                    if name and len(name.strip()) > 2:
-                        company = Company(name=name.strip())
-                        companies.add(company)
-                        logger.info(f"Found company: {name.strip()}")
+                    name = name.strip() if name else ""
+                    key = name.lower()
+                    if len(name) > 2 and key not in seen_names:
+                        seen_names.add(key)
+                        companies.add(Company(name=name))
+                        logger.info(f"Found company: {name}")
             
             logger.info(f"Found {len(companies)} unique companies (within {self.days_filter} days)")
+            if self._semantic_cache and companies:
+                self._semantic_cache.set(goal, [c.as_record() for c in companies], scope)
             return companies
             
         except Exception as e:
@@ -120,27 +531,20 @@ class TavilyAgent:
         """Use GPT to extract company names from search results"""
         try:
             prompt = f"""Extract company names from the following job search results related to "{goal}".
-Return only the company names, one per line. Do not include explanations or other text.
+Return a JSON object with a "companies" array of company names only, at most 20.
 Focus on companies that are actively hiring or have job openings.
 
 Search Results:
-{results_text[:3000]}
-
-Company names:"""
+{results_text[:COMPANY_CONTEXT_LIMIT]}"""
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts company names from job search results. Return only company names, one per line."},
-                    {"role": "user", "content": prompt}
-                ],
+            content = self._complete(
+                COMPANY_SYSTEM_PROMPT,
+                prompt,
                 temperature=0.3,
-                max_tokens=500
+                max_tokens=300,  # ~20 names; a cut-off reply fails validation and falls back to []
+                response_format=COMPANY_FORMAT
             )
-            
-            companies_text = response.choices[0].message.content.strip()
-            companies = [c.strip() for c in companies_text.split("\n") if c.strip()]
-            return companies[:20]  # Limit to top 20
+            return CompanyList.model_validate_json(content).companies[:20]  # Limit to top 20
             
         except Exception as e:
             logger.warning(f"GPT extraction failed, using fallback: {str(e)}")
@@ -151,52 +555,170 @@ Company names:"""
         Search for hiring managers and prospects at a specific company
         Returns a list of prospects
         """
-        logger.info(f"Searching for prospects at {company.name}")
-        prospects = []
-        
         try:
-            self._rate_limit()
-            query = f"hiring manager recruiter jobs at {company.name} LinkedIn"
-            response = self.client.search(
-                query=query,
-                max_results=max_results,
-                search_depth="advanced",
-                days=self.days_filter  # Add date filter
-            )
-            
-            # Filter results by date
-            results = response.get('results', [])
-            filtered_results = self._filter_results_by_date(results)
+            results_text = self._fetch_prospect_results(company, max_results)
             
             # Extract prospect information using GPT
-            results_text = "\n".join([
-                f"Title: {r.get('title', '')}\nContent: {r.get('content', '')[:500]}\nURL: {r.get('url', '')}\nDate: {r.get('published_date', 'N/A')}\n"
-                for r in filtered_results
-            ])
+            prospect_data = self._extract_prospects_with_gpt(company.name, results_text) if results_text else []
+            return self._build_company_prospects(company, prospect_data)
             
-            if results_text:
-                prospect_data = self._extract_prospects_with_gpt(company.name, results_text)
+        except Exception as e:
+            logger.error(f"Error searching prospects at {company.name}: {str(e)}")
+            return []
+    
+    def _fetch_prospect_results(self, company: Company, max_results: int,
+                                cpu_pool: Optional[ProcessPoolExecutor] = None) -> str:
+        """
+        Run the Tavily prospect search for a company, returning date-filtered results as prompt text
+        If cpu_pool is given, the post-processing runs there instead of holding the GIL in this thread
+        """
+        logger.info(f"Searching for prospects at {company.name}")
+        query = f"hiring manager recruiter jobs at {company.name} LinkedIn"
+        response = self._search(
+            query=query,
+            max_results=max_results,
+            search_depth="advanced",
+            days=self.days_filter  # Add date filter
+        )
+        
+        # Filter results by date
+        results = response.get('results', [])
+        args = (results, *self._cutoff(), self.days_filter)
+        if cpu_pool is not None:
+            return cpu_pool.submit(_prospect_results_text, *args).result()
+        return _prospect_results_text(*args)
+    
+    def _build_company_prospects(self, company: Company, prospect_data: List[dict]) -> List[Prospect]:
+        """Turn extracted name/title/linkedin records into prospects at a company"""
+        prospects = []
+        for data in prospect_data:
+            first_name, last_name = parse_name(data.get('name', ''))
+            if first_name:
+                prospect = Prospect(
+                    first_name=first_name,
+                    last_name=last_name,
+                    company_name=company.name,
+                    company_domain=company.domain,
+                    linkedin_profile=data.get('linkedin', ''),
+                    job_title=data.get('title', '')
+                )
+                prospects.append(prospect)
+                logger.info(f"Found prospect: {prospect.full_name()} at {company.name}")
+        
+        logger.info(f"Found {len(prospects)} prospects at {company.name} (within {self.days_filter} days)")
+        return prospects
+    
+    def search_prospects_bulk(self, companies: List[Company], max_results: int = 10,
+                              concurrency: Optional[int] = None) -> List[List[Prospect]]:
+        """
+        Search for prospects at many companies in parallel
+        Tavily searches and GPT extraction run as two pipelined stages: as searches
+        finish, their results are grouped several companies per GPT call (see
+        _extract_prospects_batch_with_gpt) and extracted while other searches are in flight
+        Returns one prospect list per company, in company order
+        """
+        if not companies:
+            return []
+        
+        def fetch(company: Company) -> str:
+            try:
+                return self._fetch_prospect_results(company, max_results, cpu_pool)
+            except Exception as e:
+                logger.error(f"Error searching prospects at {company.name}: {str(e)}")
+                return ""
+        
+        def submit(batch: List[tuple]) -> None:
+            extractions.append(gpt_executor.submit(self._extract_prospects_batch_with_gpt, batch))
+        
+        workers = min(concurrency or Config.TAVILY_CONCURRENCY, len(companies))
+        extractions = []
+        # Optional worker processes take result post-processing off the GIL for large runs
+        cpu_pool = ProcessPoolExecutor(max_workers=Config.POSTPROCESS_WORKERS) if Config.POSTPROCESS_WORKERS > 0 else None
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as tavily_executor, \
+                    ThreadPoolExecutor(max_workers=Config.EXTRACTION_CONCURRENCY) as gpt_executor:
+                searches = {tavily_executor.submit(fetch, company): idx for idx, company in enumerate(companies)}
+                
+                # Group companies that found results into batches bounded by count and prompt size.
+                # Batches are filled in company-name order, not completion order, so a rerun with the
+                # same results builds the same prompts and hits the extraction cache; each batch goes
+                # out as soon as the searches it needs are done, while later ones are still in flight
+                order = sorted(range(len(companies)), key=lambda i: companies[i].name.lower())
+                texts, pos = {}, 0
+                batch, batch_chars = [], 0
+                for future in as_completed(searches):
+                    texts[searches[future]] = future.result()
+                    while pos < len(order) and order[pos] in texts:
+                        idx = order[pos]
+                        pos += 1
+                        text = texts.pop(idx)[:Config.EXTRACTION_TEXT_LIMIT]
+                        if not text:
+                            continue
+                        if batch and (len(batch) >= Config.EXTRACTION_BATCH_SIZE
+                                      or batch_chars + len(text) > Config.EXTRACTION_BATCH_CHARS):
+                            submit(batch)
+                            batch, batch_chars = [], 0
+                        batch.append((idx, companies[idx].name, text))
+                        batch_chars += len(text)
+                if batch:
+                    submit(batch)
                 
-                for data in prospect_data:
-                    first_name, last_name = parse_name(data.get('name', ''))
-                    if first_name:
-                        prospect = Prospect(
-                            first_name=first_name,
-                            last_name=last_name,
-                            company_name=company.name,
-                            company_domain=company.domain,
-                            linkedin_profile=data.get('linkedin', ''),
-                            job_title=data.get('title', '')
-                        )
-                        prospects.append(prospect)
-                        logger.info(f"Found prospect: {prospect.full_name()} at {company.name}")
+                extracted = {}
+                for future in extractions:
+                    extracted.update(future.result())
+        finally:
+            if cpu_pool is not None:
+                cpu_pool.shutdown()
+        
+        return [self._build_company_prospects(company, extracted.get(idx, []))
+                for idx, company in enumerate(companies)]
+    
+    def _extract_prospects_batch_with_gpt(self, items: List[tuple]) -> dict:
+        """
+        Extract prospects for several companies in one GPT call
+        items are (index, company_name, results_text); returns index -> list of prospect dicts
+        Falls back to one call per company if the batch call fails or its output can't be routed
+        """
+        if len(items) == 1:
+            idx, company_name, text = items[0]
+            return {idx: self._extract_prospects_with_gpt(company_name, text)}
+        
+        try:
+            # Entries are numbered by position in the batch, not by company index, so the
+            # prompt depends only on the companies and their results
+            payload = orjson.dumps([{"idx": pos, "company": name, "text": text}
+                                    for pos, (_, name, text) in enumerate(items)]).decode()
+            prompt = f"""Extract hiring manager and recruiter information from the search results below.
+Each entry has an "idx", the "company" it belongs to, and the search result "text" for that company.
+For each person found, extract their full name, job title (if mentioned) and LinkedIn profile URL (if mentioned).
+Only list a person under the entry whose text mentions them.
+
+Return a JSON object with a "results" key containing one object per entry, in this format:
+{{"results": [{{"idx": 0, "prospects": [{{"name": "John Doe", "title": "Hiring Manager", "linkedin": "https://linkedin.com/in/johndoe"}}]}}]}}
+
+Entries:
+{payload}"""
             
-            logger.info(f"Found {len(prospects)} prospects at {company.name} (within {self.days_filter} days)")
-            return prospects
+            content = self._complete(
+                BATCH_PROSPECT_SYSTEM_PROMPT,
+                prompt,
+                temperature=0.3,
+                response_format=BATCH_PROSPECT_FORMAT
+            )
+            extracted = {items[entry.idx][0]: [p.model_dump() for p in entry.prospects]
+                         for entry in BatchProspectList.model_validate_json(content).results
+                         if 0 <= entry.idx < len(items)}
+            
+            missing = [item for item in items if item[0] not in extracted]
+            if missing:
+                logger.warning(f"Batch extraction missed {len(missing)} of {len(items)} companies, extracting them individually")
+            for idx, company_name, text in missing:
+                extracted[idx] = self._extract_prospects_with_gpt(company_name, text)
+            return extracted
             
         except Exception as e:
-            logger.error(f"Error searching prospects at {company.name}: {str(e)}")
-            return []
+            logger.warning(f"Batch GPT extraction failed, extracting individually: {str(e)}")
+            return {idx: self._extract_prospects_with_gpt(company_name, text) for idx, company_name, text in items}
     
     def _extract_prospects_with_gpt(self, company_name: str, results_text: str) -> List[dict]:
         """Use GPT to extract prospect information from search results"""
@@ -207,71 +729,71 @@ For each person found, extract:
 - Job title (if mentioned)
 - LinkedIn profile URL (if mentioned)
 
-Return the results as a JSON array with keys: name, title, linkedin.
+Return a JSON object with a "prospects" array of objects with keys: name, title, linkedin.
 Example format:
-[
+{{"prospects": [
   {{"name": "John Doe", "title": "Hiring Manager", "linkedin": "https://linkedin.com/in/johndoe"}},
   {{"name": "Jane Smith", "title": "Recruiter", "linkedin": ""}}
-]
+]}}
 
 Search Results:
-{results_text[:3000]}
-
-JSON array:"""
+{results_text[:Config.EXTRACTION_TEXT_LIMIT]}"""
             
-            import json
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts hiring manager and recruiter information. Return a JSON object with a 'prospects' key containing an array of prospect objects."},
-                    {"role": "user", "content": prompt}
-                ],
+            content = self._complete(
+                PROSPECT_SYSTEM_PROMPT,
+                prompt,
                 temperature=0.3,
-                response_format={"type": "json_object"}
+                response_format=PROSPECT_FORMAT
             )
-            
-            content = response.choices[0].message.content.strip()
-            # Try to parse as JSON object or array
-            try:
-                data = json.loads(content)
-                if isinstance(data, list):
-                    return data
-                elif isinstance(data, dict) and 'prospects' in data:
-                    return data['prospects']
-                elif isinstance(data, dict):
-                    # If it's a single object, wrap it in a list
-                    return [data]
-            except json.JSONDecodeError:
-                # Fallback: try to extract from text
-                logger.warning("Failed to parse GPT response as JSON, using fallback")
-                return []
-            
-            return []
+            return [p.model_dump() for p in ProspectList.model_validate_json(content).prospects]
             
         except Exception as e:
             logger.warning(f"GPT extraction failed: {str(e)}")
             return []
     
-    def search_linkedin_profiles(self, goal_query: str, max_results: int = 5) -> List[Prospect]:
+    def search_linkedin_profiles(self, goal_query: str, max_results: int = 5,
+                                 on_prospect: Optional[Callable[[Prospect], None]] = None) -> List[Prospect]:
         """
         Search specifically for LinkedIn profiles related to the goal
         This is a more direct approach that searches LinkedIn directly
         Returns a list of prospects with LinkedIn URLs and company domains
         Only returns results from the last N days (configured in __init__)
+        on_prospect, if given, is called once per unique prospect as soon as GPT has streamed it,
+        so follow-up work (e.g. email lookups) can start before the extraction finishes
         """
         logger.info(f"Searching LinkedIn profiles for: {goal_query} (within {self.days_filter} days)")
         prospects = []
+        seen = set()
+        
+        def add_prospect(prospect: Prospect) -> None:
+            prospects.append(prospect)
+            if on_prospect and prospect not in seen:
+                seen.add(prospect)
+                on_prospect(prospect)
+        
+        def add_lead(lead: dict) -> None:
+            prospect = _lead_to_prospect(lead)
+            if prospect:
+                add_prospect(prospect)
+                logger.info(f"Found lead: {prospect.full_name()} at {prospect.company_domain or ''}")
+        
+        scope = f"linkedin:{max_results}:{self.days_filter}"
+        if self._semantic_cache and not self.refresh:
+            cached = self._semantic_cache.get(goal_query, scope)
+            if cached is not None:
+                for data in cached:
+                    add_prospect(Prospect(**data))
+                return prospects
         
         try:
             # Check if API key is valid before making request
             if not Config.TAVILY_API_KEY:
                 raise ValueError("TAVILY_API_KEY is missing from configuration")
             
-            self._rate_limit()
             # Search specifically for LinkedIn profiles with date filter
             search_query = f"{goal_query} linkedin profiles"
             logger.debug(f"Making Tavily API request with query: {search_query}")
-            response = self.client.search(
+            response = self._search(
                 query=search_query,
                 search_depth="advanced",
                 max_results=max_results,
@@ -281,46 +803,39 @@ JSON array:"""
             
             # Filter results by date
             results = response.get('results', [])
-            filtered_results = self._filter_results_by_date(results)
+            filtered_results = _dedupe_results(self._filter_results_by_date(results))
+            filtered_results = _prefilter(filtered_results, _is_linkedin_profile, "LinkedIn profile")
             
             if not filtered_results:
                 logger.warning(f"No LinkedIn results found within {self.days_filter} days")
                 return prospects
             
-            # Build raw context from filtered search results
-            raw_context = ""
-            for r in filtered_results:
-                published_date = r.get('published_date', 'N/A')
-                raw_context += f"URL: {r.get('url', '')}\nContent: {r.get('content', '')}\nDate: {published_date}\n---\n"
-            
-            # Extract leads using GPT with the user's format
-            logger.info(f"Extracting names, domains, and LinkedIn URLs from {len(filtered_results)} recent results...")
-            leads = self._extract_leads_from_linkedin_search(goal_query, raw_context)
+            # Profiles whose titles spell out name and company need no GPT call
+            leftover = filtered_results
+            if Config.LINKEDIN_TITLE_PARSING:
+                leftover = []
+                for result in filtered_results:
+                    prospect = _prospect_from_title(result) if len(prospects) < max_results else None
+                    if prospect:
+                        add_prospect(prospect)
+                        logger.info(f"Found lead from title: {prospect.full_name()} at {prospect.company_name}")
+                    else:
+                        leftover.append(result)
             
-            # Convert leads to Prospect objects
-            for lead in leads:
-                first_name = lead.get('first_name', '').strip()
-                last_name = lead.get('last_name', '').strip()
-                domain = lead.get('domain', '').strip()
-                linkedin_url = lead.get('linkedin_url', '').strip()
+            remaining = max_results - len(prospects)
+            if leftover and remaining > 0:
+                # Build raw context from the results titles couldn't resolve
+                raw_context = _format_linkedin_results(leftover)
                 
-                if first_name:  # At least first name is required
-                    # Extract company name from domain if possible
-                    company_name = domain.replace('.com', '').replace('.io', '').replace('.co', '').title()
-                    if not company_name:
-                        company_name = "Unknown Company"
-                    
-                    prospect = Prospect(
-                        first_name=first_name,
-                        last_name=last_name,
-                        company_name=company_name,
-                        company_domain=domain if domain else None,
-                        linkedin_profile=linkedin_url if linkedin_url else None
-                    )
-                    prospects.append(prospect)
-                    logger.info(f"Found lead: {prospect.full_name()} at {domain}")
+                # Extract leads using GPT with the user's format
+                logger.info(f"Extracting names, domains, and LinkedIn URLs from {len(leftover)} recent results...")
+                # Leads are converted to Prospect objects as they stream in
+                self._extract_leads_from_linkedin_search(goal_query, raw_context, max_leads=remaining,
+                                                         on_lead=add_lead)
             
             logger.info(f"Found {len(prospects)} prospects from LinkedIn search (within {self.days_filter} days)")
+            if self._semantic_cache and prospects:
+                self._semantic_cache.set(goal_query, [p.as_record() for p in prospects], scope)
             return prospects
             
         except ValueError as e:
@@ -337,8 +852,13 @@ JSON array:"""
                 logger.error(f"Error searching LinkedIn profiles: {error_msg}")
             return []
     
-    def _extract_leads_from_linkedin_search(self, goal_query: str, raw_context: str) -> List[dict]:
-        """Extract leads from LinkedIn search results using GPT"""
+    def _extract_leads_from_linkedin_search(self, goal_query: str, raw_context: str,
+                                            max_leads: Optional[int] = None,
+                                            on_lead: Optional[Callable[[dict], None]] = None) -> List[dict]:
+        """
+        Extract leads from LinkedIn search results using GPT
+        The response is streamed and parsed as it arrives, stopping early once max_leads are found
+        """
         try:
             extract_prompt = f"""
 You are a lead generation expert. Extract a list of people and their LinkedIn URLs from the text below.
@@ -346,7 +866,7 @@ Format as a JSON object with a key 'leads'.
 Guess the company domain (e.g., 'consultadd.com') if not explicitly mentioned.
 
 TEXT:
-{raw_context[:5000]}
+{raw_context}
 
 OUTPUT FORMAT:
 {{
@@ -361,23 +881,17 @@ OUTPUT FORMAT:
 }}
 """
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a lead generation expert. Extract people's information from LinkedIn search results. Return only valid JSON."},
-                    {"role": "user", "content": extract_prompt}
-                ],
-                response_format={"type": "json_object"},
+            return self._stream_json_items(
+                LEAD_SYSTEM_PROMPT,
+                extract_prompt,
+                "leads",
+                max_leads,
+                on_lead,
+                response_format=LEAD_FORMAT,
                 temperature=0.3
             )
             
-            content = response.choices[0].message.content.strip()
-            data = json.loads(content)
-            leads = data.get("leads", [])
-            
-            return leads
-            
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.warning(f"Failed to parse GPT response as JSON: {str(e)}")
             return []
         except Exception as e:
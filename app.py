@@ -4,12 +4,19 @@ Flask Web Application for AI Job Seeker Agent
 Provides REST API and serves the frontend
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-import json
+from flask_compress import Compress
 import os
-from datetime import datetime
-from typing import Dict, List
+import queue
+import orjson
+import time
+import uuid
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from config import Config
 from models.prospect import Prospect
@@ -17,142 +24,322 @@ from agents.tavily_agent import TavilyAgent
 from agents.hunter_agent import HunterAgent
 from agents.email_agent import EmailAgent
 from utils.logger import setup_logger
+from utils.prospect_db import ProspectDatabase
 from utils.gmail_oauth import GmailOAuthService
 
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, which encodes prospect lists much faster than stdlib json"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__, static_folder='static', static_url_path='')
+app.json = ORJSONProvider(app)  # Used by jsonify and request.json
 CORS(app)  # Enable CORS for frontend
+# Compress JSON and static responses; prospect lists repeat URLs and company names heavily
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_STREAMS'] = False  # Buffering would hold back server-sent events
+Compress(app)
 
 logger = setup_logger("job_agent_web")
 
-# Global state for current session
-session_data: Dict = {
-    'user_info': None,
-    'prospects': [],
-    'status': {
+SESSION_COOKIE = 'sid'  # Cookie holding the browser's session id
+
+def _new_status() -> Dict:
+    """Fresh progress counters for a session"""
+    return {
         'emails_found': 0,
+        'emails_pending': 0,
         'emails_sent': 0,
         'total_prospects': 0,
         'is_processing': False,
         'current_step': None
     }
-}
+
+@dataclass(slots=True)
+class SessionState:
+    """Search results and progress for one browser session"""
+    sid: str = ""
+    user_info: Optional[Dict] = None
+    prospects: List[Prospect] = field(default_factory=list)
+    status: Dict = field(default_factory=_new_status)
+    last_seen: float = field(default_factory=time.time)
+    task_id: Optional[str] = None  # Latest search started by /api/search
+    events: Optional[queue.Queue] = None  # (event, data) progress of the latest search, for /api/search/stream
+    send_events: Optional[queue.Queue] = None  # (event, data) progress of the latest bulk send, for /api/send-emails/stream
+    auth_events: Optional[queue.Queue] = None  # (event, data) outcome of the latest Gmail OAuth flow, for /api/oauth/stream
+
+# Per-browser state, keyed by the session cookie, so concurrent users don't share results
+_sessions: Dict[str, SessionState] = {}
+_sessions_lock = threading.RLock()
+
+# Hunter lookups and each session's prospects, persisted so results survive a server restart
+prospect_db = ProspectDatabase()
+
+def _restore_session(sid: str) -> Optional[SessionState]:
+    """Rebuild a session the server no longer holds in memory from its stored prospects"""
+    stored = prospect_db.load_session(sid)
+    if stored is None:
+        return None
+    user_info, prospects = stored
+    state = SessionState(sid=sid, user_info=user_info, prospects=prospects)
+    state.status['total_prospects'] = len(prospects)
+    state.status['emails_found'] = sum(1 for p in prospects if p.email)
+    return state
+
+def current_session() -> SessionState:
+    """Return (creating if needed) the state for this request's session cookie"""
+    sid = request.cookies.get(SESSION_COOKIE)
+    now = time.time()
+    with _sessions_lock:
+        state = _sessions.get(sid) if sid else None
+        if state is None:
+            # Drop idle sessions whenever a new one starts, so the store can't grow unbounded
+            for stale in [k for k, v in _sessions.items() if now - v.last_seen > Config.SESSION_TTL]:
+                del _sessions[stale]
+            state = _restore_session(sid) if sid else None
+            if state is None:
+                sid = uuid.uuid4().hex
+                state = SessionState(sid=sid)
+                g.new_sid = sid
+            _sessions[sid] = state
+        state.last_seen = now
+    return state
+
+@app.after_request
+def set_session_cookie(response):
+    """Hand newly created sessions their cookie"""
+    sid = g.pop('new_sid', None)
+    if sid:
+        response.set_cookie(SESSION_COOKIE, sid, httponly=True, samesite='Lax', max_age=Config.SESSION_TTL)
+    return response
+
+@app.after_request
+def no_store_api(response):
+    """Keep browsers and proxies from caching per-session API data"""
+    if request.path.startswith('/api/'):
+        response.headers['Cache-Control'] = 'no-store'
+    return response
 
 # Initialize agents
 tavily_agent = None
 hunter_agent = None
-email_agent = None
+_email_agents: Dict[Optional[str], EmailAgent] = {}  # user email -> that sender's agent
 
 gmail_oauth_service = GmailOAuthService()
 
+# Searches, bulk sends and Hunter lookups outlive the request that starts them, so they run on shared pools
+_task_pool = ThreadPoolExecutor(max_workers=Config.SEARCH_WORKERS)
+_lookup_pool = ThreadPoolExecutor(max_workers=Config.HUNTER_CONCURRENCY)
+
+_agents_lock = threading.Lock()
+
+# Browser OAuth flows in progress, keyed by user email, with the event queues waiting on each
+_oauth_flows: Dict[str, List[queue.Queue]] = {}
+_oauth_lock = threading.Lock()
+
+def init_search_agents():
+    """Initialize the shared search agents (lazy loading), without building an email agent"""
+    global tavily_agent, hunter_agent
+    with _agents_lock:  # Concurrent first requests must not build two sets of clients
+        if tavily_agent is None:
+            tavily_agent = TavilyAgent()
+            hunter_agent = HunterAgent(prospect_db=prospect_db)
+    return tavily_agent, hunter_agent
+
 def init_agents(user_email: str = None):
-    """Initialize agents (lazy loading)"""
-    global tavily_agent, hunter_agent, email_agent
-    if tavily_agent is None:
-        tavily_agent = TavilyAgent()
-        hunter_agent = HunterAgent()
-    # Email agent needs to be recreated per user email
-    email_agent = EmailAgent(user_email=user_email)
-    return tavily_agent, hunter_agent, email_agent
+    """Initialize agents (lazy loading), with the email agent for user_email"""
+    init_search_agents()
+    # One email agent per sender, built once and reused by that sender's requests
+    with _agents_lock:
+        agent = _email_agents.get(user_email)
+        if agent is None:
+            agent = _email_agents[user_email] = EmailAgent(user_email=user_email)
+    return tavily_agent, hunter_agent, agent
 
-@app.route('/')
-def index():
-    """Serve the main HTML page"""
-    return send_from_directory('static', 'index.html')
+def _replace_events(state: SessionState, events: Optional[queue.Queue], attr: str = 'events') -> None:
+    """Point the session at a new task's event queue, ending any stream still reading the old one"""
+    with _sessions_lock:
+        old = getattr(state, attr)
+        if old is not None:
+            old.put(None)
+        setattr(state, attr, events)
 
-@app.route('/api/search', methods=['POST'])
-def search_prospects():
-    """Search for prospects based on user input"""
+def _event_stream(events: Optional[queue.Queue]) -> Response:
+    """Relay (event, data) items from a task's queue as server-sent events until it ends with None"""
+    def generate():
+        while events is not None:
+            try:
+                item = events.get(timeout=15)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                break
+            name, data = item
+            if name:
+                yield f"event: {name}\n"
+            yield f"data: {orjson.dumps(data).decode()}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    
+    return Response(generate(), mimetype='text/event-stream')
+
+def _record_lookup(state: SessionState, events: queue.Queue, prospect_id: int,
+                   prospect: Prospect, future: Future) -> None:
+    """Apply a finished email lookup to its session and publish it to the search's event stream"""
+    email_addr = future.result()
+    with _sessions_lock:
+        if state.events is not events:
+            return  # A newer search replaced this one
+        if email_addr:
+            prospect.email = email_addr
+            state.status['emails_found'] += 1
+        state.status['emails_pending'] -= 1
+        done = state.status['emails_pending'] == 0
+        if done:
+            state.status['is_processing'] = False
+            state.status['current_step'] = 'Ready to send emails'
+        events.put((None, {'id': prospect_id, 'prospect': prospect.to_dict(), 'status': dict(state.status)}))
+    if email_addr:
+        prospect_db.save_session_prospect(state.sid, prospect_id, prospect)
+    if done:
+        events.put(None)
+
+def _run_search(state: SessionState, events: queue.Queue, goal: str) -> None:
+    """Search for prospects off the request thread, publishing them and then each email lookup to events"""
     try:
-        data = request.json
-        user_name = data.get('name', '').strip()
-        user_email = data.get('email', '').strip()
-        user_skills = data.get('skills', '').strip()
-        goal = data.get('goal', '').strip()
-        
-        if not goal:
-            return jsonify({'error': 'Goal is required'}), 400
-        
-        # Store user info
-        session_data['user_info'] = {
-            'name': user_name,
-            'email': user_email,
-            'skills': user_skills,
-            'goal': goal
-        }
-        
-        # Update status
-        session_data['status']['is_processing'] = True
-        session_data['status']['current_step'] = 'Searching LinkedIn profiles...'
-        session_data['prospects'] = []
-        session_data['status']['emails_found'] = 0
-        session_data['status']['emails_sent'] = 0
-        
         # Initialize agents
-        tavily, hunter, email = init_agents()
+        tavily, hunter = init_search_agents()
         
-        # Step 1: Search LinkedIn profiles
+        # Step 1: Search LinkedIn profiles, starting each email lookup as soon as GPT streams
+        # its prospect, so Hunter requests overlap the rest of the extraction
         logger.info(f"Starting search for: {goal}")
-        prospects = tavily.search_linkedin_profiles(goal, max_results=10)
-        
-        if not prospects:
-            session_data['status']['is_processing'] = False
-            session_data['status']['current_step'] = 'No prospects found'
-            return jsonify({
-                'success': False,
-                'message': 'No prospects found. Try a different search query.',
-                'prospects': [],
-                'status': session_data['status']
-            })
-        
-        # Deduplicate
-        unique_prospects = list({p: p for p in prospects}.values())
-        session_data['prospects'] = unique_prospects
-        session_data['status']['total_prospects'] = len(unique_prospects)
-        session_data['status']['current_step'] = 'Finding email addresses...'
-        
-        # Step 2: Find emails (but keep all prospects, even without emails)
-        for prospect in unique_prospects:
-            try:
-                email_addr = hunter.find_email(prospect)
-                if email_addr:
-                    prospect.email = email_addr
-                    session_data['status']['emails_found'] += 1
-            except Exception as e:
-                logger.warning(f"Error finding email for {prospect.full_name()}: {str(e)}")
-                # Continue even if email not found - still include the prospect
-        
-        # Update prospects list (include all prospects, with or without emails)
-        session_data['prospects'] = unique_prospects
-        session_data['status']['is_processing'] = False
-        session_data['status']['current_step'] = 'Ready to send emails'
-        
-        # Convert prospects to dict for JSON response
-        prospects_data = [p.to_dict() for p in unique_prospects]
-        
-        return jsonify({
-            'success': True,
-            'prospects': prospects_data,
-            'status': session_data['status']
-        })
+        lookups = {}
+        
+        def start_lookup(prospect: Prospect) -> None:
+            lookups[hunter.submit_lookup(_lookup_pool, prospect)] = prospect
+        
+        prospects = tavily.search_linkedin_profiles(goal, max_results=10, on_prospect=start_lookup)
+        
+        # Deduplicate (include all prospects, with or without emails); prospects already streamed
+        # to a lookup are kept even if the search failed afterwards and returned without them
+        unique_prospects = list(dict.fromkeys([*prospects, *lookups.values()]))
+        prospect_ids = {p: i for i, p in enumerate(unique_prospects)}
+        
+        # Step 2: Publish the prospects now; emails follow as lookups finish
+        with _sessions_lock:
+            if state.events is not events:
+                return  # A newer search replaced this one
+            state.prospects = unique_prospects
+            state.status['total_prospects'] = len(unique_prospects)
+            state.status['emails_pending'] = len(lookups)
+            if lookups:
+                state.status['current_step'] = 'Finding email addresses...'
+            else:
+                state.status['is_processing'] = False
+                state.status['current_step'] = 'Ready to send emails' if unique_prospects else 'No prospects found'
+            events.put(('prospects', {
+                'prospects': [p.to_dict() for p in unique_prospects],
+                'status': dict(state.status)
+            }))
+        prospect_db.save_session(state.sid, state.user_info, unique_prospects)
+        if not lookups:
+            events.put(None)
+        for future, prospect in lookups.items():
+            future.add_done_callback(
+                lambda f, p=prospect: _record_lookup(state, events, prospect_ids[p], p, f)
+            )
         
     except Exception as e:
         logger.error(f"Error in search_prospects: {str(e)}")
-        session_data['status']['is_processing'] = False
-        session_data['status']['current_step'] = f'Error: {str(e)}'
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'status': session_data['status']
-        }), 500
+        with _sessions_lock:
+            if state.events is events:
+                state.status['is_processing'] = False
+                state.status['current_step'] = f'Error: {str(e)}'
+            events.put(('failed', {'error': str(e), 'status': dict(state.status)}))
+        events.put(None)
+
+@app.route('/')
+def index():
+    """Serve the main HTML page"""
+    return send_from_directory('static', 'index.html')
+
+@app.route('/api/search', methods=['POST'])
+def search_prospects():
+    """Start a prospect search in the background; progress and results arrive on /api/search/stream"""
+    state = current_session()
+    data = request.json
+    user_name = data.get('name', '').strip()
+    user_email = data.get('email', '').strip()
+    user_skills = data.get('skills', '').strip()
+    goal = data.get('goal', '').strip()
+    
+    if not goal:
+        return jsonify({'error': 'Goal is required'}), 400
+    
+    # Store user info
+    state.user_info = {
+        'name': user_name,
+        'email': user_email,
+        'skills': user_skills,
+        'goal': goal
+    }
+    
+    # Reset the counters and retire the old search's queue together, so none of its
+    # lookups still finishing can count against the new search
+    events = queue.Queue()
+    with _sessions_lock:
+        state.status['is_processing'] = True
+        state.status['current_step'] = 'Searching LinkedIn profiles...'
+        state.prospects = []
+        state.status['emails_found'] = 0
+        state.status['emails_pending'] = 0
+        state.status['emails_sent'] = 0
+        _replace_events(state, events)
+        state.task_id = task_id = uuid.uuid4().hex
+        status = dict(state.status)
+    _task_pool.submit(_run_search, state, events, goal)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task_id,
+        'status': status
+    }), 202
+
+@app.route('/api/search/status/<task_id>', methods=['GET'])
+def search_status(task_id):
+    """Get the progress and results of a search started by /api/search"""
+    state = current_session()
+    if task_id != state.task_id:
+        return jsonify({'error': 'Unknown task ID'}), 404
+    return jsonify({
+        'success': True,
+        'task_id': task_id,
+        'prospects': [p.to_dict() for p in state.prospects],
+        'status': state.status
+    })
+
+@app.route('/api/search/stream', methods=['GET'])
+def stream_search():
+    """
+    Stream the latest search's progress as server-sent events: a "prospects" event with the
+    search results, one unnamed event per email lookup, "failed" if the search errors, then "done"
+    """
+    return _event_stream(current_session().events)
 
 @app.route('/api/prospect/<int:prospect_id>', methods=['GET'])
 def get_prospect_details(prospect_id):
     """Get detailed information about a specific prospect"""
+    state = current_session()
     try:
-        if prospect_id < 0 or prospect_id >= len(session_data['prospects']):
+        if prospect_id < 0 or prospect_id >= len(state.prospects):
             return jsonify({'error': 'Invalid prospect ID'}), 404
         
-        prospect = session_data['prospects'][prospect_id]
+        prospect = state.prospects[prospect_id]
         return jsonify({
             'success': True,
             'prospect': prospect.to_dict()
@@ -199,31 +386,22 @@ def authenticate_gmail():
                 'credentials_missing': True
             }), 400
         
-        # Try to authenticate - this will open browser
-        try:
-            logger.info(f"Starting OAuth flow for {user_email}")
-            service = gmail_oauth_service.get_gmail_service(user_email, port=0)
-            logger.info(f"OAuth authentication successful for {user_email}")
-            return jsonify({
-                'success': True,
-                'authenticated': True,
-                'message': 'Authentication successful! Browser should have opened for authorization.'
-            })
-        except FileNotFoundError as e:
-            return jsonify({
-                'success': False,
-                'error': str(e),
-                'authenticated': False,
-                'credentials_missing': True
-            }), 400
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"OAuth error: {error_msg}")
-            return jsonify({
-                'success': False,
-                'error': f'Authentication failed: {error_msg}',
-                'authenticated': False
-            }), 500
+        # Authenticate in the background - this opens the browser and waits for the user,
+        # so the outcome arrives on /api/oauth/stream; one flow per email however often it's requested
+        events = queue.Queue()
+        _replace_events(current_session(), events, 'auth_events')
+        with _oauth_lock:
+            waiting = _oauth_flows.setdefault(user_email, [])
+            start = not waiting
+            waiting.append(events)
+        if start:
+            threading.Thread(target=_run_oauth, args=(user_email,), daemon=True).start()
+        return jsonify({
+            'success': True,
+            'authenticated': False,
+            'pending': True,
+            'message': 'Complete the authorization in the browser window that opened.'
+        }), 202
         
     except Exception as e:
         logger.error(f"Error in OAuth authentication: {str(e)}", exc_info=True)
@@ -233,6 +411,43 @@ def authenticate_gmail():
             'authenticated': False
         }), 500
 
+def _run_oauth(user_email: str) -> None:
+    """Run the browser OAuth flow off the request thread and publish its outcome to every waiting stream"""
+    try:
+        logger.info(f"Starting OAuth flow for {user_email}")
+        gmail_oauth_service.get_gmail_service(user_email, port=0)
+        logger.info(f"OAuth authentication successful for {user_email}")
+        outcome = ('authenticated', {
+            'success': True,
+            'authenticated': True,
+            'message': 'Authentication successful!'
+        })
+    except FileNotFoundError as e:
+        outcome = ('failed', {
+            'success': False,
+            'error': str(e),
+            'authenticated': False,
+            'credentials_missing': True
+        })
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"OAuth error: {error_msg}")
+        outcome = ('failed', {
+            'success': False,
+            'error': f'Authentication failed: {error_msg}',
+            'authenticated': False
+        })
+    with _oauth_lock:
+        waiting = _oauth_flows.pop(user_email, [])
+    for events in waiting:
+        events.put(outcome)
+        events.put(None)
+
+@app.route('/api/oauth/stream', methods=['GET'])
+def stream_oauth():
+    """Stream the outcome of the latest Gmail OAuth flow: "authenticated" or "failed", then done"""
+    return _event_stream(current_session().auth_events)
+
 @app.route('/api/oauth/check', methods=['POST'])
 def check_authentication():
     """Check if user is authenticated"""
@@ -263,11 +478,12 @@ def check_authentication():
 @app.route('/api/send-email/<int:prospect_id>', methods=['POST'])
 def send_single_email(prospect_id):
     """Send email to a single prospect"""
+    state = current_session()
     try:
-        if prospect_id < 0 or prospect_id >= len(session_data['prospects']):
+        if prospect_id < 0 or prospect_id >= len(state.prospects):
             return jsonify({'success': False, 'error': 'Invalid prospect ID'}), 404
         
-        prospect = session_data['prospects'][prospect_id]
+        prospect = state.prospects[prospect_id]
         
         if not prospect.email:
             return jsonify({
@@ -276,7 +492,7 @@ def send_single_email(prospect_id):
             }), 400
         
         # Get user email from session
-        user_info = session_data.get('user_info', {})
+        user_info = (state.user_info or {})
         user_email = user_info.get('email', '').strip()
         
         if not user_email:
@@ -307,11 +523,13 @@ def send_single_email(prospect_id):
         )
         
         if success:
-            session_data['status']['emails_sent'] = session_data['status'].get('emails_sent', 0) + 1
+            with _sessions_lock:  # A bulk send's progress callback updates the same counters
+                state.status['emails_sent'] = state.status.get('emails_sent', 0) + 1
+                status = dict(state.status)
             return jsonify({
                 'success': True,
                 'message': f'Email sent successfully to {prospect.full_name()}',
-                'status': session_data['status']
+                'status': status
             })
         else:
             return jsonify({
@@ -328,102 +546,121 @@ def send_single_email(prospect_id):
 
 @app.route('/api/send-emails', methods=['POST'])
 def send_emails():
-    """Send emails to all prospects with valid email addresses"""
+    """Start sending emails to all prospects with valid email addresses; progress arrives on /api/send-emails/stream"""
+    state = current_session()
+    data = request.json
+    dry_run = data.get('dry_run', False)
+    
+    prospects_with_emails = [p for p in state.prospects if p.email]
+    
+    if not prospects_with_emails:
+        return jsonify({
+            'success': False,
+            'message': 'No prospects with email addresses found',
+            'status': state.status
+        })
+    
+    # Get user email from session
+    user_info = (state.user_info or {})
+    user_email = user_info.get('email', '').strip()
+    
+    if not user_email:
+        return jsonify({
+            'success': False,
+            'message': 'User email is required. Please provide your email.',
+            'status': state.status
+        }), 400
+    
+    # Check authentication
+    if not dry_run and not gmail_oauth_service.is_authenticated(user_email):
+        return jsonify({
+            'success': False,
+            'message': 'Gmail not authenticated. Please authenticate first.',
+            'needs_auth': True,
+            'status': state.status
+        }), 401
+    
+    # Update status
+    events = queue.Queue()
+    with _sessions_lock:
+        state.status['is_processing'] = True
+        state.status['current_step'] = 'Sending emails...'
+        state.status['emails_sent'] = 0
+        _replace_events(state, events, 'send_events')
+        status = dict(state.status)
+    _task_pool.submit(_run_send, state, events, prospects_with_emails, user_info, user_email, dry_run)
+    
+    return jsonify({
+        'success': True,
+        'status': status
+    }), 202
+
+def _run_send(state: SessionState, events: queue.Queue, prospects: List[Prospect],
+              user_info: Dict, user_email: str, dry_run: bool) -> None:
+    """Send emails off the request thread, publishing the running counts to events after each send"""
+    def progress(results: dict) -> None:
+        with _sessions_lock:
+            state.status['emails_sent'] = results['sent']
+            state.status['emails_failed'] = results['failed']
+            events.put((None, {'status': dict(state.status)}))
+    
     try:
-        data = request.json
-        dry_run = data.get('dry_run', False)
-        
-        prospects_with_emails = [p for p in session_data['prospects'] if p.email]
-        
-        if not prospects_with_emails:
-            return jsonify({
-                'success': False,
-                'message': 'No prospects with email addresses found',
-                'status': session_data['status']
-            })
-        
-        # Update status
-        session_data['status']['is_processing'] = True
-        session_data['status']['current_step'] = 'Sending emails...'
-        session_data['status']['emails_sent'] = 0
-        
-        # Get user email from session
-        user_info = session_data.get('user_info', {})
-        user_email = user_info.get('email', '').strip()
-        
-        if not user_email:
-            return jsonify({
-                'success': False,
-                'message': 'User email is required. Please provide your email.',
-                'status': session_data['status']
-            }), 400
-        
-        # Check authentication
-        if not dry_run and not gmail_oauth_service.is_authenticated(user_email):
-            return jsonify({
-                'success': False,
-                'message': 'Gmail not authenticated. Please authenticate first.',
-                'needs_auth': True,
-                'status': session_data['status']
-            }), 401
-        
         # Initialize email agent with user email
         _, _, email = init_agents(user_email=user_email)
         
         # Send emails (email generation will use user info from session)
-        if dry_run:
-            results = email.send_bulk_emails(prospects_with_emails, dry_run=True, 
-                                           user_info=user_info, user_email=user_email)
-        else:
-            # For actual sending, we'll use the bulk method
-            results = email.send_bulk_emails(prospects_with_emails, dry_run=False, 
-                                           user_info=user_info, user_email=user_email)
-        
-        session_data['status']['emails_sent'] = results['sent']
-        session_data['status']['emails_failed'] = results.get('failed', 0)
-        session_data['status']['is_processing'] = False
-        session_data['status']['current_step'] = 'Emails sent successfully'
-        
-        return jsonify({
-            'success': True,
-            'message': f"Successfully sent {results['sent']} emails",
-            'status': session_data['status'],
-            'results': results
-        })
+        results = email.send_bulk_emails(prospects, dry_run=dry_run, user_info=user_info,
+                                         user_email=user_email, on_progress=progress)
+        
+        with _sessions_lock:
+            state.status['emails_sent'] = results['sent']
+            state.status['emails_failed'] = results.get('failed', 0)
+            state.status['is_processing'] = False
+            state.status['current_step'] = 'Emails sent successfully'
+            events.put(('sent', {
+                'message': f"Successfully sent {results['sent']} emails",
+                'status': dict(state.status),
+                'results': results
+            }))
         
     except Exception as e:
         logger.error(f"Error sending emails: {str(e)}")
-        session_data['status']['is_processing'] = False
-        session_data['status']['current_step'] = f'Error: {str(e)}'
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'status': session_data['status']
-        }), 500
+        with _sessions_lock:
+            state.status['is_processing'] = False
+            state.status['current_step'] = f'Error: {str(e)}'
+            events.put(('failed', {'error': str(e), 'status': dict(state.status)}))
+    events.put(None)
+
+@app.route('/api/send-emails/stream', methods=['GET'])
+def stream_send():
+    """
+    Stream the latest bulk send's progress as server-sent events: one unnamed event with the
+    running counts per send, "sent" with the results or "failed" on error, then "done"
+    """
+    return _event_stream(current_session().send_events)
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get current processing status"""
+    state = current_session()
     return jsonify({
         'success': True,
-        'status': session_data['status']
+        'status': state.status
     })
 
 @app.route('/api/reset', methods=['POST'])
 def reset_session():
-    """Reset the session data"""
-    global session_data
-    session_data = {
-        'user_info': None,
-        'prospects': [],
-        'status': {
-            'emails_found': 0,
-            'emails_sent': 0,
-            'total_prospects': 0,
-            'is_processing': False,
-            'current_step': None
-        }
-    }
+    """Reset the session data; pass {"clear_cache": true} to also drop cached searches"""
+    if (request.get_json(silent=True) or {}).get('clear_cache') and tavily_agent is not None:
+        tavily_agent.clear_cache()
+    state = current_session()
+    with _sessions_lock:
+        state.user_info = None
+        state.prospects = []
+        state.status = _new_status()
+        _replace_events(state, None)
+        _replace_events(state, None, 'send_events')
+    prospect_db.save_session(state.sid, None, [])
     return jsonify({'success': True, 'message': 'Session reset'})
 
 if __name__ == '__main__':
@@ -431,6 +668,8 @@ if __name__ == '__main__':
     try:
         Config.validate()
         logger.info("Configuration validated successfully")
+        # Build the shared agents and their connection pools now, so the first search doesn't pay for setup
+        init_search_agents()
     except ValueError as e:
         logger.error(f"Configuration error: {str(e)}")
         logger.error("Please check your .env file and ensure all required API keys are set.")
@@ -438,5 +677,12 @@ if __name__ == '__main__':
     # Create static directory if it doesn't exist
     os.makedirs('static', exist_ok=True)
     
-    # Run the Flask app
-    app.run(debug=True, host='0.0.0.0', port=8000)
+    # Run the Flask app: the debug server when FLASK_DEBUG=1, otherwise waitress, whose thread
+    # pool lets long searches run side by side. One process, since live session state (progress
+    # counters, event streams) lives in memory; only prospects are persisted
+    if os.getenv('FLASK_DEBUG') == '1':
+        app.run(debug=True, host='0.0.0.0', port=8000, threaded=True)
+    else:
+        from waitress import serve
+        logger.info(f"Serving on http://0.0.0.0:8000 with {Config.WEB_THREADS} threads")
+        serve(app, host='0.0.0.0', port=8000, threads=Config.WEB_THREADS)
@@ -12,6 +12,7 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     
     # SMTP Settings (default to SSL port 465 for Gmail)
+    # Unused by the senders, which go through the Gmail API over OAuth2; kept for older .env files
     SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
     SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))  # Default to 465 for SSL
     SMTP_USERNAME = os.getenv("SMTP_USERNAME")
@@ -21,12 +22,50 @@ class Config:
     
     # Rate Limiting
     TAVILY_RATE_LIMIT = 5  # requests per second
+    TAVILY_BURST = 5  # requests allowed back to back before the rate limit applies
+    TAVILY_MAX_IN_FLIGHT = 10  # Tavily requests open at once across all threads
+    TAVILY_CONCURRENCY = int(os.getenv("TAVILY_CONCURRENCY", "5"))  # Parallel company searches
+    EXTRACTION_CONCURRENCY = int(os.getenv("EXTRACTION_CONCURRENCY", "4"))  # Parallel batched GPT extractions
+    EXTRACTION_BATCH_SIZE = 8  # Companies per batched GPT prospect extraction
+    EXTRACTION_BATCH_CHARS = 24000  # Search-result characters per batched extraction (~6k tokens)
+    EXTRACTION_TEXT_LIMIT = 3000  # Search-result characters kept per company, as in single extraction
+    POSTPROCESS_WORKERS = int(os.getenv("POSTPROCESS_WORKERS", "0"))  # Processes for bulk result post-processing; 0 = in-thread
     HUNTER_RATE_LIMIT = 10  # requests per second
+    HUNTER_CONCURRENCY = int(os.getenv("HUNTER_CONCURRENCY", "5"))  # Parallel email lookups
+    HUNTER_DOMAIN_SEARCH_LIMIT = int(os.getenv("HUNTER_DOMAIN_SEARCH_LIMIT", "100"))  # Contacts per shared domain search; Hunter's free plan caps this at 10
+    HTTP_MAX_CONNECTIONS = 100  # Shared OpenAI connection pool, across all agents and threads
+    HTTP_MAX_KEEPALIVE = 50  # Idle OpenAI connections kept warm for reuse
     
     # Retry Settings
     MAX_RETRIES = 3
     RETRY_DELAY = 2  # seconds
-    
+    RETRY_MAX_DELAY = 30  # seconds; cap on exponential backoff
+    SEARCH_MAX_RETRIES = 5  # attempts for Tavily searches and GPT extractions on 429/5xx/connection errors
+
+    # Caching
+    CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+    EMAIL_CACHE_TTL = 86400  # seconds; generated emails are reused on reruns within a day
+    SEARCH_CACHE_TTL = 86400  # seconds; identical Tavily searches are reused within a day
+    HUNTER_CACHE_TTL = 30 * 86400  # seconds; paid Hunter lookups are reused for a month
+    EXTRACTION_CACHE_TTL = 7 * 86400  # seconds; GPT extractions of identical search results are reused for a week
+    SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "0") == "1"  # Reuse searches for paraphrased goals (opt-in)
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))  # Minimum cosine similarity
+    SEMANTIC_CACHE_TTL = 86400  # seconds
+    LINKEDIN_TITLE_PARSING = os.getenv("LINKEDIN_TITLE_PARSING", "1") == "1"  # Read "Name - Role - Company" titles without GPT
+    METRICS_FILE = os.getenv("METRICS_FILE", "metrics.jsonl")  # Per-run OpenAI token usage, one JSON object per line
+
+    # Email Sending
+    OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "8"))  # Parallel email generations
+    EMAIL_CONCURRENCY = int(os.getenv("EMAIL_CONCURRENCY", "1"))  # 1 = serial
+    EMAIL_DOMAIN_RATE = int(os.getenv("EMAIL_DOMAIN_RATE", "6"))  # Emails per minute to any one recipient domain
+    EMAIL_MAX_CONCURRENCY = 15  # Gmail throttles beyond ~15 parallel senders per account
+    GMAIL_BATCH_SIZE = 50  # Sends per Gmail HTTP batch request (API maximum is 100)
+
+    # Web App
+    SESSION_TTL = 86400  # seconds; idle browser sessions are dropped after a day
+    WEB_THREADS = int(os.getenv("WEB_THREADS", "16"))  # Concurrent requests served by app.py, open progress streams included
+    SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "4"))  # Web searches and bulk sends run in the background at once
+
     @classmethod
     def validate(cls):
         """Validate that all required API keys are present"""
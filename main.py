@@ -5,33 +5,41 @@ Orchestrates the complete flow: job search, prospect finding, email discovery, a
 """
 
 import argparse
-import json
+import orjson
 import csv
 import sys
 from typing import List, Set
 from datetime import datetime
 
 from config import Config
-from models.prospect import Company, Prospect
+from models.prospect import PROSPECT_COLUMNS, Company, Prospect
 from agents.tavily_agent import TavilyAgent
 from agents.hunter_agent import HunterAgent
 from agents.email_agent import EmailAgent
 from utils.logger import setup_logger
+from utils.prospect_db import ProspectDatabase
 
 logger = setup_logger("job_agent")
 
+# Banner line around each step heading
+SEP = "=" * 60
+
 class JobSeekerAgent:
     """Main orchestrator for the job seeker agent"""
     
-    def __init__(self, dry_run: bool = False, days_filter: int = 45):
+    def __init__(self, dry_run: bool = False, days_filter: int = 45, concurrency: int = None,
+                 batch_send: bool = False, refresh: bool = False):
         self.dry_run = dry_run
         self.days_filter = days_filter
+        self.concurrency = concurrency or Config.EMAIL_CONCURRENCY  # Parallel email senders
+        self.batch_send = batch_send  # Send through Gmail HTTP batch requests
         self.prospect_db = ProspectDatabase()  # Initialize database for caching
-        self.tavily_agent = TavilyAgent(days_filter=days_filter)  # Pass days filter
-        self.hunter_agent = HunterAgent(prospect_db=self.prospect_db)  # Pass database to hunter
+        self.tavily_agent = TavilyAgent(days_filter=days_filter, refresh=refresh)  # Pass days filter
+        self.hunter_agent = HunterAgent(prospect_db=self.prospect_db, refresh=refresh)  # Pass database to hunter
         self.email_agent = EmailAgent()
         self.companies: Set[Company] = set()
         self.prospects: List[Prospect] = []
+        self.prospects_with_emails: List[Prospect] = []  # Filled by step3_find_emails, sent by step4_send_emails
         self.results = {
             'companies_found': 0,
             'prospects_found': 0,
@@ -44,9 +52,9 @@ class JobSeekerAgent:
     
     def step1_search_companies(self, goal: str, max_companies: int = None) -> Set[Company]:
         """Step 1: Search for companies hiring"""
-        logger.info("=" * 60)
+        logger.info(SEP)
         logger.info("STEP 1: Initial Job Search")
-        logger.info("=" * 60)
+        logger.info(SEP)
         
         try:
             companies = self.tavily_agent.search_companies(goal, max_results=max_companies or 50)
@@ -60,25 +68,22 @@ class JobSeekerAgent:
     
     def step2_search_prospects(self, max_prospects_per_company: int = 5) -> List[Prospect]:
         """Step 2: Search for prospects at each company"""
-        logger.info("=" * 60)
+        logger.info(SEP)
         logger.info("STEP 2: Company-Specific Job Search")
-        logger.info("=" * 60)
+        logger.info(SEP)
         
         all_prospects = []
-        total_companies = len(self.companies)
+        companies = list(self.companies)
+        logger.info(f"Searching {len(companies)} companies for prospects...")
         
-        for idx, company in enumerate(self.companies, 1):
-            logger.info(f"Processing company {idx}/{total_companies}: {company.name}")
-            try:
-                prospects = self.tavily_agent.search_prospects(company, max_results=max_prospects_per_company)
-                all_prospects.extend(prospects)
-                logger.info(f"✓ Found {len(prospects)} prospects at {company.name}")
-            except Exception as e:
-                logger.warning(f"✗ Failed to find prospects at {company.name}: {str(e)}")
-                continue
+        # search_prospects logs and swallows its own errors, returning [] on failure
+        results = self.tavily_agent.search_prospects_bulk(companies, max_results=max_prospects_per_company)
+        for company, prospects in zip(companies, results):
+            all_prospects.extend(prospects)
+            logger.info(f"✓ Found {len(prospects)} prospects at {company.name}")
         
         # Deduplicate prospects
-        unique_prospects = list({p: p for p in all_prospects}.values())
+        unique_prospects = list(dict.fromkeys(all_prospects))
         self.prospects = unique_prospects
         self.results['prospects_found'] = len(unique_prospects)
         logger.info(f"✓ Total unique prospects found: {len(unique_prospects)}")
@@ -86,38 +91,35 @@ class JobSeekerAgent:
     
     def step3_find_emails(self) -> List[Prospect]:
         """Step 3: Find email addresses for prospects"""
-        logger.info("=" * 60)
+        logger.info(SEP)
         logger.info("STEP 3: Email Discovery")
-        logger.info("=" * 60)
+        logger.info(SEP)
         
         prospects_with_emails = []
         total_prospects = len(self.prospects)
+        logger.info(f"Finding emails for {total_prospects} prospects...")
         
-        for idx, prospect in enumerate(self.prospects, 1):
-            logger.info(f"Finding email {idx}/{total_prospects}: {prospect.full_name()}")
-            try:
-                email = self.hunter_agent.find_email(prospect)
-                if email:
-                    prospect.email = email
-                    prospects_with_emails.append(prospect)
-                    self.results['emails_found'] += 1
-                    logger.info(f"✓ Found email for {prospect.full_name()}")
-                else:
-                    logger.warning(f"✗ No email found for {prospect.full_name()}")
-            except Exception as e:
-                logger.warning(f"✗ Error finding email for {prospect.full_name()}: {str(e)}")
-                continue
+        emails = self.hunter_agent.find_emails_bulk(self.prospects)
+        for prospect, email in zip(self.prospects, emails):
+            if email:
+                prospect.email = email
+                prospects_with_emails.append(prospect)
+                self.results['emails_found'] += 1
+                logger.info(f"✓ Found email for {prospect.full_name()}")
+            else:
+                logger.warning(f"✗ No email found for {prospect.full_name()}")
         
         logger.info(f"✓ Found emails for {len(prospects_with_emails)} prospects")
+        self.prospects_with_emails = prospects_with_emails
         return prospects_with_emails
     
     def step4_send_emails(self, template_path: str = None) -> None:
-        """Step 4: Generate and send emails using bulk sending with delays"""
-        logger.info("=" * 60)
+        """Step 4: Generate and send emails using bulk sending, paced per recipient domain"""
+        logger.info(SEP)
         logger.info("STEP 4: Email Generation & Sending")
-        logger.info("=" * 60)
+        logger.info(SEP)
         
-        prospects_with_emails = [p for p in self.prospects if p.email]
+        prospects_with_emails = self.prospects_with_emails
         total = len(prospects_with_emails)
         
         if not prospects_with_emails:
@@ -136,12 +138,19 @@ class JobSeekerAgent:
             self.results['emails_sent'] = total
             return
         
-        # Use bulk sending with human-like delays
-        logger.info(f"Sending {total} emails with human-like delays (5-15s between each)...")
+        # Use bulk sending: serial, a concurrent worker pool, or Gmail batches
+        if self.batch_send:
+            logger.info(f"Sending {total} emails in Gmail batch requests...")
+        elif self.concurrency > 1:
+            logger.info(f"Sending {total} emails with {self.concurrency} concurrent workers...")
+        else:
+            logger.info(f"Sending {total} emails, at most {Config.EMAIL_DOMAIN_RATE}/min per recipient domain...")
         bulk_results = self.email_agent.send_bulk_emails(
             prospects_with_emails,
             template_path=template_path,
-            dry_run=False
+            dry_run=False,
+            concurrency=self.concurrency,
+            batch=self.batch_send
         )
         
         self.results['emails_sent'] = bulk_results['sent']
@@ -163,15 +172,16 @@ class JobSeekerAgent:
                 'companies': [{'name': c.name, 'domain': c.domain} for c in self.companies],
                 'prospects': [p.to_dict() for p in self.prospects]
             }
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Same pretty-printed document as json.dump(indent=2), encoded in C
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         elif format == 'csv':
             with open(filename, 'w', newline='') as f:
                 if self.prospects:
-                    writer = csv.DictWriter(f, fieldnames=self.prospects[0].to_dict().keys())
-                    writer.writeheader()
-                    writer.writerows([p.to_dict() for p in self.prospects])
+                    writer = csv.writer(f)
+                    writer.writerow(PROSPECT_COLUMNS)
+                    writer.writerows(p.to_row() for p in self.prospects)
         
         logger.info(f"Results exported to {filename}")
         return filename
@@ -188,9 +198,9 @@ class JobSeekerAgent:
             logger.info(f"Dry Run: {self.dry_run}")
             
             # Step 1: Search LinkedIn profiles directly
-            logger.info("=" * 60)
+            logger.info(SEP)
             logger.info("STEP 1: LinkedIn Profile Search")
-            logger.info("=" * 60)
+            logger.info(SEP)
             
             prospects = self.tavily_agent.search_linkedin_profiles(goal, max_results=max_results)
             
@@ -199,16 +209,13 @@ class JobSeekerAgent:
                 return
             
             # Deduplicate prospects
-            unique_prospects = list({p: p for p in prospects}.values())
+            unique_prospects = list(dict.fromkeys(prospects))
             self.prospects = unique_prospects
             self.results['prospects_found'] = len(unique_prospects)
             logger.info(f"✓ Found {len(unique_prospects)} unique prospects")
             
             # Step 2: Find emails via Hunter.io
-            self.step3_find_emails()
-            
-            prospects_with_emails = [p for p in self.prospects if p.email]
-            if not prospects_with_emails:
+            if not self.step3_find_emails():
                 logger.warning("No emails found. Exiting.")
                 return
             
@@ -220,14 +227,14 @@ class JobSeekerAgent:
             self.export_results(export_format)
             
             # Print summary
-            logger.info("=" * 60)
+            logger.info(SEP)
             logger.info("SUMMARY")
-            logger.info("=" * 60)
+            logger.info(SEP)
             logger.info(f"Prospects found: {self.results['prospects_found']}")
             logger.info(f"Emails found: {self.results['emails_found']}")
             logger.info(f"Emails sent: {self.results['emails_sent']}")
             logger.info(f"Emails failed: {self.results['emails_failed']}")
-            logger.info("=" * 60)
+            logger.info(SEP)
             
         except Exception as e:
             logger.error(f"Fatal error: {str(e)}")
@@ -256,10 +263,7 @@ class JobSeekerAgent:
                 return
             
             # Step 3: Find emails
-            self.step3_find_emails()
-            
-            prospects_with_emails = [p for p in self.prospects if p.email]
-            if not prospects_with_emails:
+            if not self.step3_find_emails():
                 logger.warning("No emails found. Exiting.")
                 return
             
@@ -271,15 +275,15 @@ class JobSeekerAgent:
             self.export_results(export_format)
             
             # Print summary
-            logger.info("=" * 60)
+            logger.info(SEP)
             logger.info("SUMMARY")
-            logger.info("=" * 60)
+            logger.info(SEP)
             logger.info(f"Companies found: {self.results['companies_found']}")
             logger.info(f"Prospects found: {self.results['prospects_found']}")
             logger.info(f"Emails found: {self.results['emails_found']}")
             logger.info(f"Emails sent: {self.results['emails_sent']}")
             logger.info(f"Emails failed: {self.results['emails_failed']}")
-            logger.info("=" * 60)
+            logger.info(SEP)
             
         except Exception as e:
             logger.error(f"Fatal error: {str(e)}")
@@ -355,6 +359,25 @@ def main():
         help='Filter results to last N days (default: 45 days)'
     )
     
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=Config.EMAIL_CONCURRENCY,
+        help=f'Number of parallel email senders (default: {Config.EMAIL_CONCURRENCY}, max: {Config.EMAIL_MAX_CONCURRENCY})'
+    )
+    
+    parser.add_argument(
+        '--batch-send',
+        action='store_true',
+        help=f'Send emails in Gmail HTTP batch requests of up to {Config.GMAIL_BATCH_SIZE} (no delays between emails)'
+    )
+    
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Ignore cached Tavily searches, GPT extractions and Hunter.io lookups and query the APIs again'
+    )
+    
     args = parser.parse_args()
     
     # Validate configuration
@@ -366,7 +389,8 @@ def main():
         sys.exit(1)
     
     # Run the agent with days filter
-    agent = JobSeekerAgent(dry_run=args.dry_run, days_filter=args.days)
+    agent = JobSeekerAgent(dry_run=args.dry_run, days_filter=args.days, concurrency=args.concurrency,
+                           batch_send=args.batch_send, refresh=args.refresh)
     logger.info(f"Filtering results to last {args.days} days")
     
     try:
@@ -0,0 +1,77 @@
+"""
+Extraction Schemas
+Shapes of the JSON that GPT returns, enforced at decode time through OpenAI structured outputs
+"""
+
+from typing import List, Type
+from pydantic import BaseModel
+
+
+class CompanyList(BaseModel):
+    """Hiring companies named in job search results"""
+    companies: List[str]
+
+
+class ProspectItem(BaseModel):
+    """A hiring manager or recruiter found in company search results"""
+    name: str
+    title: str = ""
+    linkedin: str = ""
+
+
+class ProspectList(BaseModel):
+    """Prospects extracted for one company"""
+    prospects: List[ProspectItem]
+
+
+class BatchProspectEntry(BaseModel):
+    """Prospects extracted for one entry of a batched extraction"""
+    idx: int
+    prospects: List[ProspectItem]
+
+
+class BatchProspectList(BaseModel):
+    """Prospects extracted for several companies in one call"""
+    results: List[BatchProspectEntry]
+
+
+class LeadItem(BaseModel):
+    """A person found in LinkedIn search results"""
+    first_name: str
+    last_name: str = ""
+    domain: str = ""
+    linkedin_url: str = ""
+
+
+class LeadList(BaseModel):
+    """Leads extracted from LinkedIn search results"""
+    leads: List[LeadItem]
+
+
+def _strict(schema):
+    """Rewrite a pydantic JSON schema in place into the subset strict structured outputs accept"""
+    schema.pop("title", None)
+    schema.pop("default", None)
+    if "properties" in schema:
+        # Strict mode needs every property listed as required and no extra keys
+        schema["required"] = list(schema["properties"])
+        schema["additionalProperties"] = False
+    # Recurse through subschemas only; keys of properties/$defs are field and model names
+    for name in ("properties", "$defs"):
+        for subschema in schema.get(name, {}).values():
+            _strict(subschema)
+    if "items" in schema:
+        _strict(schema["items"])
+    return schema
+
+
+def response_format(model: Type[BaseModel]) -> dict:
+    """Build a chat completions response_format that constrains output to model's schema"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model.__name__,
+            "strict": True,
+            "schema": _strict(model.model_json_schema())
+        }
+    }
@@ -1,21 +1,34 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Company:
     """Represents a company"""
     name: str
     domain: Optional[str] = None
+    # Case-folded identity, computed once since dedup and set lookups hash and compare it repeatedly
+    _key: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._key = self.name.lower()
     
     def __hash__(self):
-        return hash(self.name.lower())
+        return hash(self._key)
     
     def __eq__(self, other):
         if isinstance(other, Company):
-            return self.name.lower() == other.name.lower()
+            return self._key == other._key
         return False
+    
+    def as_record(self) -> dict:
+        """Constructor fields as a dict, for storing and rebuilding with Company(**record)"""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+
+# Columns of Prospect.to_dict, in order, for exports that write to_row() tuples
+PROSPECT_COLUMNS = ('first_name', 'last_name', 'full_name', 'company_name',
+                    'company_domain', 'linkedin_profile', 'email', 'job_title')
 
-@dataclass
+@dataclass(slots=True)
 class Prospect:
     """Represents a hiring prospect"""
     first_name: str
@@ -25,17 +38,24 @@ class Prospect:
     linkedin_profile: Optional[str] = None
     email: Optional[str] = None
     job_title: Optional[str] = None
+    # Case-folded identity; names are never reassigned after construction, so it stays valid
+    _key: tuple = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._key = (self.first_name.lower(), self.last_name.lower(), self.company_name.lower())
     
     def __hash__(self):
-        return hash((self.first_name.lower(), self.last_name.lower(), self.company_name.lower()))
+        return hash(self._key)
     
     def __eq__(self, other):
         if isinstance(other, Prospect):
-            return (self.first_name.lower() == other.first_name.lower() and
-                   self.last_name.lower() == other.last_name.lower() and
-                   self.company_name.lower() == other.company_name.lower())
+            return self._key == other._key
         return False
     
+    def as_record(self) -> dict:
+        """Constructor fields as a dict, for storing and rebuilding with Prospect(**record)"""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+    
     def full_name(self) -> str:
         """Return full name"""
         return f"{self.first_name} {self.last_name}".strip()
@@ -52,3 +72,8 @@ class Prospect:
             'email': self.email,
             'job_title': self.job_title
         }
+    
+    def to_row(self) -> tuple:
+        """Values of to_dict as a tuple in PROSPECT_COLUMNS order, for writing CSV rows without a dict per prospect"""
+        return (self.first_name, self.last_name, self.full_name(), self.company_name,
+                self.company_domain, self.linkedin_profile, self.email, self.job_title)
@@ -113,31 +113,86 @@ async function handleSearch(e) {
         const data = await response.json();
         
         if (data.success) {
-            prospects = data.prospects || [];
-            console.log('Received prospects:', prospects); // Debug log
+            // The search runs in the background; results and emails arrive on the stream
             updateStatus(data.status);
-            displayProspects(prospects);
-            updateStatusMessage('Prospects found! Click on any prospect to view details.');
-            
-            // Check Gmail auth status after search
-            checkGmailAuth();
-            
-            if (prospects.length > 0 && prospects.some(p => p && p.email)) {
-                sendEmailsBtn.style.display = 'block';
-            }
+            streamSearch();
         } else {
             updateStatusMessage(`Error: ${data.error || data.message || 'Unknown error'}`);
             alert(data.message || 'Failed to search prospects');
+            setLoading(false);
         }
     } catch (error) {
         console.error('Search error:', error);
         updateStatusMessage(`Error: ${error.message}`);
         alert('Failed to search prospects. Please try again.');
-    } finally {
         setLoading(false);
     }
 }
 
+// ============================================
+// Search Stream
+// ============================================
+function streamSearch() {
+    const source = new EventSource(`${API_BASE}/api/search/stream`);
+    
+    source.addEventListener('prospects', (event) => {
+        const data = JSON.parse(event.data);
+        prospects = data.prospects || [];
+        console.log('Received prospects:', prospects); // Debug log
+        updateStatus(data.status);
+        setLoading(false);
+        
+        if (prospects.length === 0) {
+            updateStatusMessage('No prospects found. Try a different search query.');
+            alert('No prospects found. Try a different search query.');
+            return;
+        }
+        
+        displayProspects(prospects);
+        updateStatusMessage(data.status.emails_pending > 0
+            ? 'Finding email addresses...'
+            : 'Prospects found! Click on any prospect to view details.');
+        
+        // Check Gmail auth status after search
+        checkGmailAuth();
+        
+        if (prospects.some(p => p && p.email)) {
+            sendEmailsBtn.style.display = 'block';
+        }
+    });
+    
+    // Email lookups finish in the background; fill them in as they arrive
+    source.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        prospects[data.id] = data.prospect;
+        updateStatus(data.status);
+        displayProspects(prospects);
+        if (data.prospect.email) {
+            sendEmailsBtn.style.display = 'block';
+        }
+    };
+    
+    source.addEventListener('failed', (event) => {
+        const data = JSON.parse(event.data);
+        updateStatus(data.status);
+        updateStatusMessage(`Error: ${data.error}`);
+        alert('Failed to search prospects. Please try again.');
+    });
+    
+    source.addEventListener('done', () => {
+        source.close();
+        setLoading(false);
+        if (prospects.length > 0) {
+            updateStatusMessage('Prospects found! Click on any prospect to view details.');
+        }
+    });
+    
+    source.onerror = () => {
+        source.close();
+        setLoading(false);
+    };
+}
+
 // ============================================
 // Send Emails Handler
 // ============================================
@@ -162,23 +217,59 @@ async function handleSendEmails() {
         const data = await response.json();
         
         if (data.success) {
+            // Sending runs in the background; watch the counts climb on the stream
             updateStatus(data.status);
-            updateStatusMessage(`✅ ${data.message}`);
-            alert(`Successfully sent ${data.status.emails_sent} emails!`);
+            streamSend();
         } else {
             updateStatusMessage(`Error: ${data.error || data.message}`);
             alert(data.message || 'Failed to send emails');
+            finishSend();
         }
     } catch (error) {
         console.error('Send emails error:', error);
         updateStatusMessage(`Error: ${error.message}`);
         alert('Failed to send emails. Please try again.');
-    } finally {
-        setLoading(false);
-        sendEmailsBtn.disabled = false;
+        finishSend();
     }
 }
 
+function streamSend() {
+    const source = new EventSource(`${API_BASE}/api/send-emails/stream`);
+    
+    source.onmessage = (event) => {
+        updateStatus(JSON.parse(event.data).status);
+    };
+    
+    source.addEventListener('sent', (event) => {
+        const data = JSON.parse(event.data);
+        updateStatus(data.status);
+        updateStatusMessage(`✅ ${data.message}`);
+        alert(`Successfully sent ${data.status.emails_sent} emails!`);
+    });
+    
+    source.addEventListener('failed', (event) => {
+        const data = JSON.parse(event.data);
+        updateStatus(data.status);
+        updateStatusMessage(`Error: ${data.error}`);
+        alert('Failed to send emails. Please try again.');
+    });
+    
+    source.addEventListener('done', () => {
+        source.close();
+        finishSend();
+    });
+    
+    source.onerror = () => {
+        source.close();
+        finishSend();
+    };
+}
+
+function finishSend() {
+    setLoading(false);
+    sendEmailsBtn.disabled = false;
+}
+
 // ============================================
 // Display Prospects (Accordion)
 // ============================================
@@ -663,7 +754,13 @@ async function handleGmailAuth() {
             body: JSON.stringify({ email: email })
         });
         
-        const data = await response.json();
+        let data = await response.json();
+        
+        // The flow runs on the server until the browser authorization completes
+        if (data.pending) {
+            showAuthStatus('Complete the authorization in the browser window that opened...', 'info');
+            data = await waitForGmailAuth();
+        }
         
         if (data.success && data.authenticated) {
             showAuthStatus('✅ Gmail authenticated successfully!', 'success');
@@ -701,6 +798,26 @@ async function handleGmailAuth() {
     }
 }
 
+function waitForGmailAuth() {
+    return new Promise((resolve) => {
+        const source = new EventSource(`${API_BASE}/api/oauth/stream`);
+        let result = { success: false, error: 'Authentication did not complete' };
+        const finish = () => {
+            source.close();
+            resolve(result);
+        };
+        
+        source.addEventListener('authenticated', (event) => {
+            result = JSON.parse(event.data);
+        });
+        source.addEventListener('failed', (event) => {
+            result = JSON.parse(event.data);
+        });
+        source.addEventListener('done', finish);
+        source.onerror = finish;
+    });
+}
+
 function showAuthStatus(message, type) {
     if (!authStatus) return;
     authStatus.textContent = message;
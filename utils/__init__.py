@@ -1,4 +1,4 @@
 from .logger import setup_logger
-from .validators import validate_email, extract_domain, parse_name
+from .validators import validate_email, extract_domain, is_corporate_domain, parse_name
 
-__all__ = ['setup_logger', 'validate_email', 'extract_domain', 'parse_name']
+__all__ = ['setup_logger', 'validate_email', 'extract_domain', 'is_corporate_domain', 'parse_name']
@@ -0,0 +1,180 @@
+"""
+Persistent Response Cache
+SQLite-backed key/value store used to avoid repeating paid API calls across runs
+"""
+
+import os
+import orjson
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, List, Optional
+from config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def make_key(*parts: str) -> str:
+    """Build a cache key from everything that determines a response"""
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Namespaced key/value cache with per-entry expiry, persisted in SQLite"""
+
+    def __init__(self, namespace: str, ttl: int = 86400, path: str = None):
+        """
+        Initialize the cache
+
+        Args:
+            namespace: Logical cache name, so several caches can share one database
+            ttl: Seconds before an entry expires
+            path: SQLite database path (defaults to CACHE_DIR/responses.sqlite3)
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.path = path or os.path.join(Config.CACHE_DIR, "responses.sqlite3")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Cache read failed ({self.namespace}): {str(e)}")
+            return None
+
+        if row is None or row[1] < time.time():
+            return None
+        return orjson.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under key"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, orjson.dumps(value).decode(), time.time() + self.ttl)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Cache write failed ({self.namespace}): {str(e)}")
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace"""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Cache clear failed ({self.namespace}): {str(e)}")
+
+
+class SemanticCache:
+    """
+    Cache that matches entries by embedding similarity instead of exact key,
+    so paraphrased queries can share one stored result
+    """
+
+    def __init__(self, namespace: str, embed: Callable[[str], List[float]], threshold: float = 0.92,
+                 ttl: int = 86400, path: str = None):
+        """
+        Initialize the cache
+
+        Args:
+            namespace: Logical cache name, so several caches can share one database
+            embed: Function returning an embedding vector for a text
+            threshold: Minimum cosine similarity for a stored entry to count as a hit
+            ttl: Seconds before an entry expires
+            path: SQLite database path (defaults to CACHE_DIR/responses.sqlite3)
+        """
+        self.namespace = namespace
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.path = path or os.path.join(Config.CACHE_DIR, "responses.sqlite3")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_cache ("
+            "namespace TEXT NOT NULL, scope TEXT NOT NULL, text TEXT NOT NULL, "
+            "vector TEXT NOT NULL, value TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _unit_vector(self, text: str) -> List[float]:
+        """Embed text and scale to unit length, so cosine similarity is a plain dot product"""
+        vector = self.embed(text)
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def get(self, text: str, scope: str = "") -> Optional[Any]:
+        """
+        Return the value stored for the most similar text in scope, or None if
+        nothing unexpired reaches the similarity threshold
+        scope separates results that differ by more than the text (e.g. result limits)
+        """
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT text, vector, value FROM semantic_cache "
+                    "WHERE namespace = ? AND scope = ? AND expires >= ?",
+                    (self.namespace, scope, time.time())
+                ).fetchall()
+            if not rows:
+                return None
+            query = self._unit_vector(text)
+        except Exception as e:
+            logger.debug(f"Semantic cache lookup failed ({self.namespace}): {str(e)}")
+            return None
+
+        best_score, best_row = -1.0, None
+        for row in rows:
+            score = sum(a * b for a, b in zip(query, orjson.loads(row[1])))
+            if score > best_score:
+                best_score, best_row = score, row
+        if best_score < self.threshold:
+            return None
+        logger.info(f"Semantic cache hit ({best_score:.3f}): '{text}' ~ '{best_row[0]}'")
+        return orjson.loads(best_row[2])
+
+    def set(self, text: str, value: Any, scope: str = "") -> None:
+        """Store a JSON-serializable value for text, dropping expired entries"""
+        try:
+            vector = self._unit_vector(text)
+            with self._lock:
+                self._conn.execute("DELETE FROM semantic_cache WHERE expires < ?", (time.time(),))
+                self._conn.execute(
+                    "INSERT INTO semantic_cache (namespace, scope, text, vector, value, expires) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, scope, text, orjson.dumps(vector).decode(),
+                     orjson.dumps(value).decode(), time.time() + self.ttl)
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.debug(f"Semantic cache write failed ({self.namespace}): {str(e)}")
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace"""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM semantic_cache WHERE namespace = ?", (self.namespace,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Semantic cache clear failed ({self.namespace}): {str(e)}")
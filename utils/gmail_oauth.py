@@ -4,21 +4,94 @@ Handles OAuth flow and Gmail API service creation
 """
 
 import os
-import json
 import base64
-from email.message import EmailMessage
+import queue
+import tempfile
+import threading
+from email.header import Header
+from typing import List, Optional
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# MIME headers shared by every plain-text email, serialized once; only To, Subject and the body vary
+_PLAIN_TEXT_MIME_HEADERS = (
+    b'MIME-Version: 1.0\r\n'
+    b'Content-Type: text/plain; charset="utf-8"\r\n'
+    b'Content-Transfer-Encoding: base64\r\n'
+)
+
 # Gmail API scopes - only need send permission
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
+# Built services, with the credentials they were built from, are shared by every GmailOAuthService
+# instance, so agents created per web request or per CLI step reuse one authorized service
+_SERVICE_CACHE = {}
+_SERVICE_CACHE_LOCK = threading.Lock()
+
+# Parsed token files keyed by path, with the mtime they were read at, so a token is
+# re-parsed only after a new authorization or refresh rewrites it
+_TOKEN_CACHE = {}
+
+def _load_token(token_path: str) -> Optional[Credentials]:
+    """Parse a token file (None if missing), reusing the last parse while the file is unchanged"""
+    try:
+        mtime = os.stat(token_path).st_mtime_ns
+    except OSError:
+        return None
+    with _SERVICE_CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(token_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    with _SERVICE_CACHE_LOCK:
+        _TOKEN_CACHE[token_path] = (mtime, creds)
+    return creds
+
+def _per_thread_request_builder(creds: Credentials):
+    """
+    Return a googleapiclient requestBuilder that gives each thread its own
+    authorized transport. httplib2 is not thread-safe, but one transport per
+    thread keeps connections alive while threads share a single service.
+    """
+    local = threading.local()
+    
+    def build_request(http, *args, **kwargs):
+        thread_http = getattr(local, 'http', None)
+        if thread_http is None:
+            thread_http = local.http = AuthorizedHttp(creds, http=httplib2.Http())
+        return HttpRequest(thread_http, *args, **kwargs)
+    
+    return build_request
+
+class GmailServicePool:
+    """Fixed-size pool of Gmail API services shared by concurrent senders"""
+    
+    def __init__(self, services: List[object]):
+        # Each service owns its own httplib2 transport, which is not thread-safe,
+        # so a service must only be used by one worker at a time
+        self._services = queue.Queue()
+        for service in services:
+            self._services.put(service)
+        self.size = len(services)
+    
+    def acquire(self) -> object:
+        """Check out a service, blocking until one is free"""
+        return self._services.get()
+    
+    def release(self, service: object) -> None:
+        """Return a service to the pool"""
+        self._services.put(service)
+
+
 class GmailOAuthService:
     """Manages Gmail OAuth2 authentication and service"""
     
@@ -36,7 +109,7 @@ class GmailOAuthService:
         )
         self.token_dir = token_dir
         os.makedirs(token_dir, exist_ok=True)
-        self._service_cache = {}
+        self._service_cache = _SERVICE_CACHE
     
     def get_token_path(self, email: str) -> str:
         """Get token file path for a specific email"""
@@ -89,25 +162,74 @@ class GmailOAuthService:
             Gmail API service object
         """
         # Check cache first
-        if email in self._service_cache:
-            try:
-                service = self._service_cache[email]
-                # Test if service is still valid
-                service.users().getProfile(userId='me').execute()
+        with _SERVICE_CACHE_LOCK:
+            cached = self._service_cache.get(email)
+        if cached is not None:
+            service, creds = cached
+            # Checked locally rather than with a getProfile round-trip: the service's
+            # AuthorizedHttp transports refresh an expired token themselves when they can
+            if creds.valid or creds.refresh_token:
                 return service
-            except:
-                # Service expired, remove from cache
-                del self._service_cache[email]
+            with _SERVICE_CACHE_LOCK:
+                self._service_cache.pop(email, None)
+        
+        creds = self.get_credentials(email, port=port, authorization_code=authorization_code)
+        
+        # Build and cache service
+        service = self._build_service(creds)
+        with _SERVICE_CACHE_LOCK:
+            self._service_cache[email] = (service, creds)
+        
+        return service
+    
+    def get_service_pool(self, email: str, size: int) -> GmailServicePool:
+        """
+        Build a pool of Gmail services for concurrent sending
+        
+        Args:
+            email: User's email address (must already be authorized)
+            size: Number of services in the pool
+        
+        Returns:
+            GmailServicePool with one independent service per slot
+        """
+        creds = self.get_credentials(email)
+        services = [self._build_service(creds) for _ in range(max(1, size))]
+        logger.info(f"Created Gmail service pool of {len(services)} for {email}")
+        return GmailServicePool(services)
+    
+    def _build_service(self, creds: Credentials) -> object:
+        """Build a thread-safe Gmail API service from credentials"""
+        # Static discovery uses the document bundled with googleapiclient,
+        # avoiding a fetch from discovery.googleapis.com on every build
+        return build(
+            'gmail', 'v1',
+            credentials=creds,
+            requestBuilder=_per_thread_request_builder(creds),
+            cache_discovery=False,
+            static_discovery=True
+        )
+    
+    def get_credentials(self, email: str, port: int = 0, authorization_code: str = None) -> Credentials:
+        """
+        Load, refresh, or obtain OAuth credentials for a user
+        
+        Args:
+            email: User's email address
+            port: Port for OAuth callback (0 = auto-assign, for desktop apps)
+            authorization_code: OAuth authorization code (for web apps)
         
+        Returns:
+            Valid Google OAuth2 credentials
+        """
         creds = None
         token_path = self.get_token_path(email)
         
         # Load existing token if available
-        if os.path.exists(token_path):
-            try:
-                creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-            except Exception as e:
-                logger.warning(f"Error loading token for {email}: {str(e)}")
+        try:
+            creds = _load_token(token_path)
+        except Exception as e:
+            logger.warning(f"Error loading token for {email}: {str(e)}")
         
         # If no valid credentials, get new ones
         if not creds or not creds.valid:
@@ -151,16 +273,47 @@ class GmailOAuthService:
                 
                 logger.info(f"New authorization completed for {email}")
             
-            # Save credentials
-            with open(token_path, 'w') as token:
-                token.write(creds.to_json())
+            # Save credentials; written aside and swapped in, so a crash can't leave a torn token file.
+            # Each writer gets its own temp file, since pool workers can refresh one token at once
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(token_path) or '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as token:
+                    token.write(creds.to_json())
+                os.replace(tmp_path, token_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
             logger.info(f"Saved token for {email}")
         
-        # Build and cache service
-        service = build('gmail', 'v1', credentials=creds)
-        self._service_cache[email] = service
+        return creds
+    
+    def _encode_message(self, recipient: str, subject: str, body: str) -> dict:
+        """Build the Gmail API request body for a plain-text email"""
+        # Gmail API uses 'me' to represent authenticated user
+        # The actual from address is determined by the authenticated account
+        # Headers are written directly rather than through EmailMessage, which
+        # re-runs its header policy and folding machinery for every message
+        if '\r' in recipient or '\n' in recipient:
+            raise ValueError(f"Invalid recipient address: {recipient!r}")
+        subject = ' '.join(subject.splitlines())
+        if not subject.isascii():
+            subject = Header(subject, 'utf-8').encode(linesep='\r\n')
+        if not body.endswith('\n'):
+            body += '\n'
         
-        return service
+        message = b''.join((
+            b'To: ', recipient.encode('utf-8'), b'\r\n',
+            b'Subject: ', subject.encode('ascii'), b'\r\n',
+            _PLAIN_TEXT_MIME_HEADERS,
+            b'\r\n',
+            # encodebytes ends lines with bare LF; the message is CRLF throughout
+            base64.encodebytes(body.encode('utf-8')).replace(b'\n', b'\r\n')
+        ))
+        
+        # Encode message
+        encoded_message = base64.urlsafe_b64encode(message).decode()
+        
+        return {'raw': encoded_message}
     
     def send_message(self, service: object, recipient: str, subject: str, body: str, 
                     from_email: str = None) -> dict:
@@ -178,19 +331,7 @@ class GmailOAuthService:
             Message ID if successful
         """
         try:
-            message = EmailMessage()
-            message.set_content(body)
-            message['To'] = recipient
-            message['Subject'] = subject
-            # Gmail API uses 'me' to represent authenticated user
-            # The actual from address is determined by the authenticated account
-            
-            # Encode message
-            encoded_message = base64.urlsafe_b64encode(
-                message.as_bytes()
-            ).decode()
-            
-            create_message = {'raw': encoded_message}
+            create_message = self._encode_message(recipient, subject, body)
             
             # Send message
             send_result = service.users().messages().send(
@@ -208,17 +349,64 @@ class GmailOAuthService:
             logger.error(f"Error sending email: {str(e)}")
             raise
     
+    def send_messages_batch(self, service: object, messages: List[dict],
+                            batch_size: int = 50) -> List[object]:
+        """
+        Send many emails through Gmail's HTTP batch endpoint
+        
+        Args:
+            service: Gmail API service object
+            messages: Dicts with 'recipient', 'subject' and 'body' keys
+            batch_size: Sub-requests per HTTP batch (Gmail allows at most 100)
+        
+        Returns:
+            One entry per message, in order: the send result dict, or the
+            exception raised for that message (a failed batch request is the
+            outcome of each of its messages that got no response)
+        """
+        outcomes = [None] * len(messages)
+        
+        def on_done(request_id, response, exception):
+            outcomes[int(request_id)] = exception if exception is not None else response
+        
+        batch_size = min(batch_size, 100)
+        for start in range(0, len(messages), batch_size):
+            end = min(start + batch_size, len(messages))
+            batch = service.new_batch_http_request(callback=on_done)
+            for idx in range(start, end):
+                msg = messages[idx]
+                batch.add(
+                    service.users().messages().send(
+                        userId='me',
+                        body=self._encode_message(msg['recipient'], msg['subject'], msg['body'])
+                    ),
+                    request_id=str(idx)
+                )
+            try:
+                batch.execute()
+            except Exception as e:
+                # Only this chunk failed; earlier chunks' outcomes stand and later chunks still go out
+                logger.warning(f"Batch request for messages {start + 1}-{end} failed: {str(e)}")
+                for idx in range(start, end):
+                    if outcomes[idx] is None:
+                        outcomes[idx] = e
+        
+        sent = sum(1 for outcome in outcomes if not isinstance(outcome, Exception))
+        logger.info(f"Batch send complete: {sent}/{len(messages)} accepted")
+        return outcomes
+    
     def revoke_token(self, email: str) -> bool:
         """Revoke token for a user"""
         try:
             token_path = self.get_token_path(email)
             if os.path.exists(token_path):
-                creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+                creds = _load_token(token_path)
                 if creds:
                     creds.revoke(Request())
                 os.remove(token_path)
-                if email in self._service_cache:
-                    del self._service_cache[email]
+                with _SERVICE_CACHE_LOCK:
+                    self._service_cache.pop(email, None)
+                    _TOKEN_CACHE.pop(token_path, None)
                 logger.info(f"Revoked token for {email}")
                 return True
         except Exception as e:
@@ -227,12 +415,9 @@ class GmailOAuthService:
     
     def is_authenticated(self, email: str) -> bool:
         """Check if user is authenticated"""
-        token_path = self.get_token_path(email)
-        if not os.path.exists(token_path):
-            return False
-        
         try:
-            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+            creds = _load_token(self.get_token_path(email))
+            # Validity is checked on every call, since a cached token can expire
             if creds and creds.valid:
                 return True
             elif creds and creds.expired and creds.refresh_token:
@@ -0,0 +1,61 @@
+"""
+Shared HTTP Clients
+Process-wide connection pools, so every agent instance reuses the same warm keep-alive connections
+"""
+
+import atexit
+import threading
+import importlib.util
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from openai import DefaultHttpxClient
+from config import Config
+
+# HTTP/2 multiplexes concurrent OpenAI calls over one connection, but needs the optional h2 package
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_lock = threading.Lock()
+_openai_http_client = None
+_tavily_session = None
+_hunter_session = None
+
+
+def openai_http_client() -> httpx.Client:
+    """Return the httpx client shared by every OpenAI client in the process"""
+    global _openai_http_client
+    with _lock:
+        if _openai_http_client is None:
+            _openai_http_client = DefaultHttpxClient(
+                http2=_HTTP2,
+                limits=httpx.Limits(max_connections=Config.HTTP_MAX_CONNECTIONS,
+                                    max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE)
+            )
+            atexit.register(_openai_http_client.close)
+    return _openai_http_client
+
+
+def tavily_session() -> requests.Session:
+    """Return the requests session shared by every Tavily client in the process"""
+    global _tavily_session
+    with _lock:
+        if _tavily_session is None:
+            _tavily_session = requests.Session()
+            _tavily_session.mount("https://", HTTPAdapter(
+                pool_connections=1, pool_maxsize=max(10, Config.TAVILY_CONCURRENCY)
+            ))
+            atexit.register(_tavily_session.close)
+    return _tavily_session
+
+
+def hunter_session() -> requests.Session:
+    """Return the requests session shared by every Hunter agent in the process"""
+    global _hunter_session
+    with _lock:
+        if _hunter_session is None:
+            _hunter_session = requests.Session()
+            _hunter_session.mount("https://", HTTPAdapter(
+                pool_connections=1, pool_maxsize=max(10, Config.HUNTER_CONCURRENCY)
+            ))
+            atexit.register(_hunter_session.close)
+    return _hunter_session
@@ -0,0 +1,127 @@
+"""
+Prospect Database
+SQLite store of Hunter.io lookups so reruns never pay twice for the same prospect,
+and of web app sessions' prospects so they survive a restart
+"""
+
+import os
+import orjson
+import time
+import sqlite3
+import threading
+from typing import Any, List, Optional, Tuple
+from config import Config
+from models.prospect import Prospect
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ProspectDatabase:
+    """Persistent cache of parsed Hunter.io responses, shared across runs"""
+
+    def __init__(self, path: str = None, ttl: int = None):
+        """
+        Initialize the database
+
+        Args:
+            path: SQLite database path (defaults to CACHE_DIR/prospects.sqlite3)
+            ttl: Seconds before a cached lookup expires (defaults to Config.HUNTER_CACHE_TTL)
+        """
+        self.path = path or os.path.join(Config.CACHE_DIR, "prospects.sqlite3")
+        self.ttl = ttl or Config.HUNTER_CACHE_TTL
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL lets readers carry on while a write commits; with WAL, NORMAL sync only fsyncs at
+        # checkpoints, so each lookup's commit stays cheap and a crash can lose only the latest ones
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hunter_lookups ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS web_sessions ("
+            "session TEXT PRIMARY KEY, user_info TEXT, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_prospects ("
+            "session TEXT NOT NULL, idx INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (session, idx))"
+        )
+        self._conn.commit()
+
+    def get_lookup(self, key: str) -> Optional[Any]:
+        """Return the cached Hunter response for key, or None if missing or expired"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response, expires FROM hunter_lookups WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Prospect database read failed: {str(e)}")
+            return None
+
+        if row is None or row[1] < time.time():
+            return None
+        return orjson.loads(row[0])
+
+    def put_lookup(self, key: str, response: Any) -> None:
+        """Store a parsed Hunter response, including ones that found no email"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO hunter_lookups (key, response, expires) VALUES (?, ?, ?)",
+                    (key, orjson.dumps(response).decode(), time.time() + self.ttl)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Prospect database write failed: {str(e)}")
+
+    def save_session(self, session: str, user_info: Optional[dict], prospects: List[Prospect]) -> None:
+        """Replace a web session's stored user info and prospects, dropping sessions idle past SESSION_TTL"""
+        now = time.time()
+        rows = [(session, idx, orjson.dumps(p.as_record()).decode()) for idx, p in enumerate(prospects)]
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM web_sessions WHERE updated < ?", (now - Config.SESSION_TTL,))
+                self._conn.execute("DELETE FROM session_prospects WHERE session NOT IN (SELECT session FROM web_sessions)")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO web_sessions (session, user_info, updated) VALUES (?, ?, ?)",
+                    (session, orjson.dumps(user_info).decode(), now)
+                )
+                self._conn.execute("DELETE FROM session_prospects WHERE session = ?", (session,))
+                self._conn.executemany("INSERT INTO session_prospects (session, idx, data) VALUES (?, ?, ?)", rows)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Session write failed: {str(e)}")
+
+    def save_session_prospect(self, session: str, idx: int, prospect: Prospect) -> None:
+        """Update one stored prospect of a web session (e.g. once its email is found)"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE session_prospects SET data = ? WHERE session = ? AND idx = ?",
+                    (orjson.dumps(prospect.as_record()).decode(), session, idx)
+                )
+                self._conn.execute("UPDATE web_sessions SET updated = ? WHERE session = ?", (time.time(), session))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Session write failed: {str(e)}")
+
+    def load_session(self, session: str) -> Optional[Tuple[Optional[dict], List[Prospect]]]:
+        """Return a stored web session's (user_info, prospects), or None if unknown or expired"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT user_info, updated FROM web_sessions WHERE session = ?", (session,)
+                ).fetchone()
+                if row is None or row[1] < time.time() - Config.SESSION_TTL:
+                    return None
+                data = self._conn.execute(
+                    "SELECT data FROM session_prospects WHERE session = ? ORDER BY idx", (session,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.debug(f"Session read failed: {str(e)}")
+            return None
+        return orjson.loads(row[0]), [Prospect(**orjson.loads(d[0])) for d in data]
@@ -0,0 +1,72 @@
+"""
+Rate Limiting
+Thread-safe token bucket shared by concurrent API callers
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+
+class TokenBucket:
+    """Token bucket that lets bursts through up to capacity while holding the average to rate per second"""
+
+    def __init__(self, rate: float, capacity: float = None, max_in_flight: int = None):
+        """
+        Initialize the bucket
+
+        Args:
+            rate: Tokens added per second (the sustained request rate)
+            capacity: Maximum burst size (defaults to rate, i.e. one second of requests)
+            max_in_flight: Cap on requests running at once through slot() (defaults to no cap)
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Block until tokens are available, then take them"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self.rate
+            # Sleep outside the lock so other threads can refill and check too
+            time.sleep(wait_time)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for at least seconds, e.g. for a server's Retry-After"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going into debt makes acquire wait out the pause before the next token is free
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    @contextmanager
+    def slot(self, tokens: float = 1):
+        """Hold one of max_in_flight slots for the duration of the block, after taking tokens"""
+        if self._in_flight is None:
+            self.acquire(tokens)
+            yield
+            return
+        with self._in_flight:
+            self.acquire(tokens)
+            yield
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds a 429/503 response asks the client to wait, or None if it doesn't say"""
+    value = getattr(response, 'headers', {}).get('Retry-After')
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None  # Missing, or an HTTP date, which these APIs don't send
@@ -1,33 +1,43 @@
 import re
+from functools import lru_cache
 from typing import Optional
 from email_validator import validate_email as validate_email_format, EmailNotValidError
 
+# Cheap shape check that rejects most malformed addresses before the full RFC validation
+_EMAIL_SHAPE_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+# Scheme and www. prefix, then the host up to any port, path, query or fragment, in one scan
+_DOMAIN_RE = re.compile(r"\s*(?:https?://)?(?:www\.)?([^/:?#\s]*)", re.IGNORECASE)
+
+# Free-mail providers and job boards; Hunter has no company emails to find at these
+NON_CORPORATE_DOMAINS = frozenset({
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'live.com',
+    'msn.com', 'aol.com', 'icloud.com', 'me.com', 'mac.com', 'protonmail.com', 'proton.me',
+    'gmx.com', 'mail.com', 'yandex.com', 'zoho.com',
+    'linkedin.com', 'indeed.com', 'glassdoor.com', 'ziprecruiter.com', 'monster.com',
+    'wellfound.com', 'angel.co', 'lever.co', 'greenhouse.io', 'myworkdayjobs.com'
+})
+
+@lru_cache(maxsize=4096)
 def validate_email(email: str) -> bool:
     """Validate email format"""
+    if not email or not _EMAIL_SHAPE_RE.fullmatch(email):
+        return False
     try:
         validate_email_format(email, check_deliverability=False)
         return True
     except EmailNotValidError:
         return False
 
+@lru_cache(maxsize=4096)
 def extract_domain(url_or_domain: str) -> Optional[str]:
     """Extract domain from URL or return domain if already provided"""
     if not url_or_domain:
         return None
-    
-    # Remove protocol
-    domain = url_or_domain.replace("https://", "").replace("http://", "").replace("www.", "")
-    
-    # Remove path
-    domain = domain.split("/")[0]
-    
-    # Remove port
-    domain = domain.split(":")[0]
-    
-    # Remove query params
-    domain = domain.split("?")[0]
-    
-    return domain.lower().strip()
+    return _DOMAIN_RE.match(url_or_domain).group(1).lower()
+
+def is_corporate_domain(domain: Optional[str]) -> bool:
+    """Check that a domain is set and isn't a free-mail provider or job board"""
+    return bool(domain) and extract_domain(domain) not in NON_CORPORATE_DOMAINS
 
 def parse_name(full_name: str) -> tuple:
     """Parse full name into first and last name"""